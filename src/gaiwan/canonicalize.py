@@ -14,16 +14,20 @@ from gaiwan.schema_generator import generate_schema
 from tqdm import tqdm
 import orjson
 from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import chain
 import multiprocessing
 import pyarrow as pa
 import pyarrow.parquet as pq
 import re
+import sys
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
 # Constants
 MAX_WORKERS = min(32, multiprocessing.cpu_count())  # Use actual core count, capped at 32
+STATUS_ID_RE = re.compile(r'(\d+)')  # Leading numeric part of a /status/ URL segment
+TWEET_SECTIONS = ('tweets', 'community-tweet', 'note-tweet')  # Archive sections holding tweets
 
 @dataclass(frozen=True)
 class TweetID:
@@ -122,16 +126,17 @@ class CanonicalTweet:
                 
                 # Extract quoted tweet ID from URLs if not already found through metadata
                 is_quote = data.get('is_quote_status', False)
+                raw_entities = data.get('entities', {})
                 
                 # Check URLs for quoted tweets
-                for url in data.get('entities', {}).get('urls', []):
+                for url in raw_entities.get('urls', []):
                     expanded_url = url.get('expanded_url', '')
                     # Match twitter.com status URLs
                     if 'twitter.com' in expanded_url and '/status/' in expanded_url:
                         try:
                             # Extract status ID from URL and take only numeric part
                             status_part = expanded_url.split('/status/')[-1].split('/')[0]
-                            if match := re.match(r'(\d+)', status_part):
+                            if match := STATUS_ID_RE.match(status_part):
                                 status_id = match.group(1)
                                 # Only use if it's not a self-quote and is a valid ID
                                 if status_id != data['id_str'] and len(status_id) <= 19:
@@ -149,11 +154,10 @@ class CanonicalTweet:
                         logger.warning(f"Quote tweet {data['id_str']} missing quoted_status_id_str")
                 
                 # Convert entities with proper integer types
-                raw_entities = data.get('entities', {})
                 entities = {
                     'hashtags': [
                         {
-                            'text': str(h['text']),
+                            'text': sys.intern(str(h['text'])),
                             'indices': [int(idx) for idx in h['indices']]
                         }
                         for h in raw_entities.get('hashtags', [])
@@ -169,7 +173,7 @@ class CanonicalTweet:
                     ],
                     'user_mentions': [
                         {
-                            'screen_name': str(m['screen_name']),
+                            'screen_name': sys.intern(str(m['screen_name'])),
                             'indices': [int(idx) for idx in m['indices']],
                             'id': int(m['id'])
                         }
@@ -196,6 +200,11 @@ class CanonicalTweet:
                     ]
                 }
                 
+                # Reply targets repeat across an archive; keep one copy of each
+                reply_to = data.get('in_reply_to_screen_name')
+                if reply_to:
+                    reply_to = sys.intern(reply_to)
+                
                 return cls(
                     id=tweet_id,
                     text=text,
@@ -203,7 +212,7 @@ class CanonicalTweet:
                     author_username=username,
                     retweet_count=int(data.get('retweet_count', 0)),
                     in_reply_to_status_id=TweetID.from_any(data['in_reply_to_status_id_str']) if data.get('in_reply_to_status_id_str') else None,
-                    in_reply_to_username=data.get('in_reply_to_screen_name'),
+                    in_reply_to_username=reply_to,
                     quoted_tweet_id=quoted_id,
                     entities=entities
                 )
@@ -219,7 +228,7 @@ class CanonicalTweet:
                 entities = {
                     'hashtags': [
                         {
-                            'text': str(h['text']),
+                            'text': sys.intern(str(h['text'])),
                             'indices': [int(h['fromIndex']), int(h['toIndex'])]
                         }
                         for h in data['core'].get('hashtags', [])
@@ -263,15 +272,16 @@ def process_archive(path: Path) -> Dict:
     }
     
     # Process tweets and build reply graph
-    for section in ['tweets', 'community-tweet', 'note-tweet']:
-        for tweet_data in data.get(section, []):
-            tweet = CanonicalTweet.from_any_tweet(tweet_data, username)
-            if tweet:
-                result['tweets'][tweet.id] = tweet
-                if tweet.in_reply_to_status_id:
-                    # Add to reply_ids of parent tweet if it exists
-                    if tweet.in_reply_to_status_id in result['tweets']:
-                        result['tweets'][tweet.in_reply_to_status_id].reply_ids.add(tweet.id)
+    tweets = result['tweets']
+    from_any_tweet = CanonicalTweet.from_any_tweet
+    for tweet_data in chain.from_iterable(data.get(section, ()) for section in TWEET_SECTIONS):
+        tweet = from_any_tweet(tweet_data, username)
+        if tweet:
+            tweets[tweet.id] = tweet
+            parent_id = tweet.in_reply_to_status_id
+            # Add to reply_ids of parent tweet if it exists
+            if parent_id and parent_id in tweets:
+                tweets[parent_id].reply_ids.add(tweet.id)
     
     # Process likes, creating CanonicalTweets for liked tweets we don't have
     for like in data.get('like', []):
@@ -279,10 +289,11 @@ def process_archive(path: Path) -> Dict:
             like_data = like['like']
             if tweet_id := like_data.get('tweetId'):
                 tid = TweetID.from_str(tweet_id)
-                if tid not in result['tweets']:
+                existing = tweets.get(tid)
+                if existing is None:
                     # Create tweet even if no text - it might have had media or be part of a thread
                     text = like_data.get('fullText', '')  # Default to empty string
-                    result['tweets'][tid] = CanonicalTweet(
+                    tweets[tid] = CanonicalTweet(
                         id=tid,
                         text=text,
                         _created_at=tid.timestamp,  # Always derive from ID for likes
@@ -292,7 +303,7 @@ def process_archive(path: Path) -> Dict:
                     )
                 else:
                     # Add this user as a liker
-                    result['tweets'][tid].likers.add(username)
+                    existing.likers.add(username)
     
     return result
 
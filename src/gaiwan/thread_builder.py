@@ -8,19 +8,22 @@ import json
 import logging
 from pathlib import Path
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
 import multiprocessing
 import os
 import tempfile
 import shutil
 import re
+import sys
 from datetime import datetime, timezone
 import pprint
 import random
 import pickle
 import hashlib
+from itertools import islice
 
 import duckdb
+import orjson
 import pandas as pd
 
 # Disable the Google API warning
@@ -113,10 +116,10 @@ def create_tables(con):
 def inspect_archive_format(file_path):
     """Analyze the structure of a Twitter archive file to understand its format."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open(file_path, 'rb') as f:
             try:
                 # First try parsing as pure JSON
-                data = json.load(f)
+                data = orjson.loads(f.read())
                 
                 # Log the top-level keys to understand structure
                 if isinstance(data, dict):
@@ -206,9 +209,9 @@ def more_detailed_archive_inspection(archive_files):
     
     for file_path in archive_files:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open(file_path, 'rb') as f:
                 try:
-                    data = json.load(f)
+                    data = orjson.loads(f.read())
                     
                     # Track structure
                     if not isinstance(data, dict):
@@ -296,8 +299,8 @@ def process_archive(file_path, user_cache={}):
     logger.info(f"Processing archive: {file_path.name}")
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
         
         # Extract user profile information
         user_info = {}
@@ -418,6 +421,10 @@ def process_archive(file_path, user_cache={}):
         logger.error(f"Error processing archive {file_path.name}: {e}")
         return [], {}
 
+def _intern(value):
+    """Intern strings so repeated handles, tags and ids share one object."""
+    return sys.intern(value) if isinstance(value, str) else value
+
 def process_tweet(tweet_obj, user_info, tweet_type, archive_file):
     """Process a tweet object from the archive and extract relevant information."""
     try:
@@ -438,12 +445,12 @@ def process_tweet(tweet_obj, user_info, tweet_type, archive_file):
             # Extract hashtags
             for tag in entities.get('hashtags', []):
                 if 'text' in tag:
-                    hashtags.append(tag['text'])
+                    hashtags.append(_intern(tag['text']))
                     
             # Extract user mentions
             for mention in entities.get('user_mentions', []):
                 if 'screen_name' in mention:
-                    user_mentions.append(mention['screen_name'])
+                    user_mentions.append(_intern(mention['screen_name']))
         
         # Extract media from extended_entities if available
         if 'extended_entities' in tweet_obj and 'media' in tweet_obj['extended_entities']:
@@ -464,13 +471,13 @@ def process_tweet(tweet_obj, user_info, tweet_type, archive_file):
             'user_screen_name': user_info.get('user_screen_name', ''),
             'user_name': user_info.get('user_name', ''),
             'in_reply_to_status_id': tweet_obj.get('in_reply_to_status_id_str'),
-            'in_reply_to_user_id': tweet_obj.get('in_reply_to_user_id_str'),
-            'in_reply_to_screen_name': tweet_obj.get('in_reply_to_screen_name'),
+            'in_reply_to_user_id': _intern(tweet_obj.get('in_reply_to_user_id_str')),
+            'in_reply_to_screen_name': _intern(tweet_obj.get('in_reply_to_screen_name')),
             'retweet_count': tweet_obj.get('retweet_count', 0),
             'favorite_count': tweet_obj.get('favorite_count', 0),
             'full_text': tweet_obj.get('full_text', ''),
-            'lang': tweet_obj.get('lang', ''),
-            'source': tweet_obj.get('source', ''),
+            'lang': _intern(tweet_obj.get('lang', '')),
+            'source': _intern(tweet_obj.get('source', '')),
             'created_at': created_at,
             'favorited': tweet_obj.get('favorited', False),
             'retweeted': tweet_obj.get('retweeted', False),
@@ -489,7 +496,7 @@ def process_tweet(tweet_obj, user_info, tweet_type, archive_file):
             # Try to extract from archive filename
             if '_archive.json' in archive_file:
                 extracted_name = archive_file.replace('_archive.json', '')
-                tweet['user_screen_name'] = extracted_name
+                tweet['user_screen_name'] = _intern(extracted_name)
         
         return tweet
     except Exception as e:
@@ -515,14 +522,14 @@ def process_note_tweet(note_tweet_obj, user_info, archive_file):
         # Process mentions in note tweets
         for mention in core.get('mentions', []):
             if 'screenName' in mention:
-                user_mentions.append(mention['screenName'])
+                user_mentions.append(_intern(mention['screenName']))
                 
         # Process hashtags in note tweets
         for tag in core.get('hashtags', []):
             if isinstance(tag, dict) and 'text' in tag:
-                hashtags.append(tag['text'])
+                hashtags.append(_intern(tag['text']))
             elif isinstance(tag, str):
-                hashtags.append(tag)
+                hashtags.append(_intern(tag))
         
         # Parse timestamp (note tweets use createdAt in ISO format)
         created_at = parse_twitter_timestamp(note_tweet_obj.get('createdAt'))
@@ -691,6 +698,24 @@ def load_checkpoint(con, checkpoint_file):
         logger.error(f"Failed to load checkpoint: {e}")
     return False
 
+def iter_parsed_archives(archive_files, max_workers=MAX_WORKERS):
+    """Parse archives in worker processes, yielding (file_path, future) as each finishes.
+    
+    Only a couple of archives per worker are in flight at once, so parsed
+    tweets don't pile up in memory while the caller is inserting them.
+    """
+    files = iter(archive_files)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(process_archive, file_path): file_path
+                   for file_path in islice(files, max_workers * 2)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = pending.pop(future)
+                for next_path in islice(files, 1):
+                    pending[executor.submit(process_archive, next_path)] = next_path
+                yield file_path, future
+
 def multi_stage_process(archive_files, temp_dir, output_dir, batch_size):
     """
     Process archives in multiple stages with checkpointing for resilience.
@@ -718,12 +743,12 @@ def multi_stage_process(archive_files, temp_dir, output_dir, batch_size):
     archive_count = 0
     
     try:
-        # Process each archive individually to minimize memory usage
-        for file_path in remaining_archives:
+        # Archives are parsed in worker processes; inserts stay on this connection
+        for file_path, future in iter_parsed_archives(remaining_archives):
             try:
                 archive_count += 1
                 logger.info(f"Processing archive {archive_count}/{len(remaining_archives)}: {file_path.name}")
-                tweets, _ = process_archive(file_path)
+                tweets, _ = future.result()
                 
                 if tweets:
                     # Insert tweets in smaller batches to avoid memory issues
@@ -860,8 +885,8 @@ def table_exists(con, table_name):
 def debug_archive_structure(file_path):
     """Debug a specific archive file to understand its structure."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
         
         # Analyze top level structure
         logger.info(f"DEBUG - Top level keys in {file_path.name}: {list(data.keys())}")
@@ -1,6 +1,6 @@
 from pathlib import Path
-import json
 import logging
+import orjson
 from typing import Dict, List, Optional
 from datetime import datetime
 import pandas as pd
@@ -33,8 +33,8 @@ class Archive:
     def load(self) -> None:
         """Load archive data from file."""
         try:
-            with open(self.file_path) as f:
-                data = json.load(f)
+            with open(self.file_path, 'rb') as f:
+                data = orjson.loads(f.read())
                 
             # Load account info and track identity
             if 'account' in data and data['account']:
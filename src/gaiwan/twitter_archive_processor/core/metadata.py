@@ -1,12 +1,15 @@
 from dataclasses import dataclass
-from typing import Dict, Set, Any
+from typing import AbstractSet, Dict, FrozenSet, Set, Any
+
+# Shared value for entity sets that are empty, so tweets don't each allocate one
+EMPTY_SET: FrozenSet[str] = frozenset()
 
 @dataclass
 class TweetMetadata:
     """Contains metadata about a tweet."""
     tweet_type: str
     raw_data: Dict[str, Any]
-    urls: Set[str]
+    urls: AbstractSet[str]
     mentioned_users: Set[str] = None
     hashtags: Set[str] = None
     quoted_tweet_id: str = None
@@ -5,6 +5,9 @@ from typing import Optional, List, Dict, Set, ClassVar
 
 from ..core.metadata import TweetMetadata
 
+# Words starting with these (mentions, URLs, hashtags) are dropped by clean_text
+STRIPPED_PREFIXES = ('@', 'http', '#')
+
 @dataclass
 class BaseTweet(ABC):
     """Base class for all tweet types."""
@@ -15,11 +18,6 @@ class BaseTweet(ABC):
     parent_id: Optional[str]
     metadata: TweetMetadata
 
-    @abstractmethod
-    def clean_text(self) -> str:
-        """Clean the tweet text."""
-        pass
-
     @abstractmethod
     def get_urls(self) -> Set[str]:
         """Extract URLs from the tweet."""
@@ -44,17 +42,13 @@ class BaseTweet(ABC):
     def clean_text(self) -> str:
         """Remove mentions, URLs, and hashtags from text."""
         text = self.text
-        
-        # Remove @mentions
-        text = ' '.join(word for word in text.split() if not word.startswith('@'))
-        
-        # Remove URLs
-        text = ' '.join(word for word in text.split() if not word.startswith('http'))
-        
-        # Remove hashtags
-        text = ' '.join(word for word in text.split() if not word.startswith('#'))
-        
-        return ' '.join(text.split())
+        # Most tweets have nothing to strip; a substring test is a C-level
+        # scan, far cheaper than checking every word
+        if not any(prefix in text for prefix in STRIPPED_PREFIXES):
+            return ' '.join(text.split())
+        # One split and one join; joining on single spaces also collapses
+        # runs of whitespace
+        return ' '.join(word for word in text.split() if not word.startswith(STRIPPED_PREFIXES))
 
     def get_urls(self) -> Set[str]:
         """Extract URLs from tweet metadata."""
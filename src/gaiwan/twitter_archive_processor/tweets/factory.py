@@ -3,7 +3,7 @@ from typing import Dict, Optional, Type
 
 from .base import BaseTweet
 from .types import StandardTweet, NoteTweet
-from ..core.metadata import TweetMetadata
+from ..core.metadata import EMPTY_SET, TweetMetadata
 
 class TweetFactory:
     """Factory for creating different types of tweets."""
@@ -37,7 +37,7 @@ class TweetFactory:
                     metadata=TweetMetadata(
                         tweet_type='like',
                         raw_data=data['like'],
-                        urls=set()
+                        urls=EMPTY_SET
                     )
                 )
             return None
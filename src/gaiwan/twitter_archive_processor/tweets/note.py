@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional, Dict, Set
 from .base import BaseTweet
-from ..core.metadata import TweetMetadata
+from ..core.metadata import EMPTY_SET, TweetMetadata
 
 class NoteTweet(BaseTweet):
     def __init__(
@@ -20,21 +20,6 @@ class NoteTweet(BaseTweet):
         self.parent_id = parent_id
         self.metadata = metadata
 
-    def clean_text(self) -> str:
-        """Remove mentions, URLs, and hashtags from text."""
-        text = self.text
-        
-        # Remove @mentions
-        text = ' '.join(word for word in text.split() if not word.startswith('@'))
-        
-        # Remove URLs
-        text = ' '.join(word for word in text.split() if not word.startswith('http'))
-        
-        # Remove hashtags
-        text = ' '.join(word for word in text.split() if not word.startswith('#'))
-        
-        return ' '.join(text.split())
-
     @classmethod
     def from_raw_data(cls, data: Dict) -> 'NoteTweet':
         """Create a NoteTweet from raw Twitter API data."""
@@ -57,7 +42,7 @@ class NoteTweet(BaseTweet):
             metadata=TweetMetadata(
                 tweet_type='note',
                 raw_data=data,
-                urls=set()
+                urls=EMPTY_SET
             )
         )
 
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional, Dict, Set
 from .base import BaseTweet
-from ..core.metadata import TweetMetadata
+from ..core.metadata import EMPTY_SET, TweetMetadata
 
 class StandardTweet(BaseTweet):
     def __init__(
@@ -20,21 +20,6 @@ class StandardTweet(BaseTweet):
         self.parent_id = parent_id
         self.metadata = metadata
 
-    def clean_text(self) -> str:
-        """Remove mentions, URLs, and hashtags from text."""
-        text = self.text
-        
-        # Remove @mentions
-        text = ' '.join(word for word in text.split() if not word.startswith('@'))
-        
-        # Remove URLs
-        text = ' '.join(word for word in text.split() if not word.startswith('http'))
-        
-        # Remove hashtags
-        text = ' '.join(word for word in text.split() if not word.startswith('#'))
-        
-        return ' '.join(text.split())  # Clean up extra spaces 
-
     def get_urls(self) -> Set[str]:
         """Extract URLs from tweet metadata."""
         if 'entities' in self.metadata.raw_data:
@@ -82,6 +67,6 @@ class StandardTweet(BaseTweet):
             metadata=TweetMetadata(
                 tweet_type='tweet',
                 raw_data=data,
-                urls=set()
+                urls=EMPTY_SET
             )
         ) 
\ No newline at end of file
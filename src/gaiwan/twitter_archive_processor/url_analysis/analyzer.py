@@ -5,23 +5,131 @@ from typing import Dict, Set, Optional, List
 import requests
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
-import functools
 import pandas as pd
-from datetime import datetime, timezone
+import pyarrow as pa
+import pyarrow.compute as pc
+from datetime import datetime, timezone, timedelta
 from urllib.parse import urlparse
 import orjson
 from tqdm import tqdm
 import asyncio
-import aiohttp
-import gc
+from concurrent.futures import ProcessPoolExecutor
 
 from .metadata import URLMetadata
 from .domain import DomainNormalizer
 from .content import ContentAnalyzer, PageContent
+from .cache import ContentCache
 from .apis.config import Config
+from ...config import config
 
 logger = logging.getLogger(__name__)
 
+# Shortener redirects practically never change, so resolutions are kept long
+RESOLVED_URL_TTL = timedelta(days=365)
+
+# Timestamp format of created_at in archive tweets
+TWEET_TIME_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+# Columns of the per-archive URL frame, all but the timestamp text
+ARCHIVE_URL_COLUMNS = (
+    'username', 'tweet_id', 'url', 'domain', 'raw_domain', 'protocol', 'path', 'query', 'fragment'
+)
+
+# URLs in tweet text, up to the next whitespace
+TWEET_URL_PATTERN = re.compile(r'https?://[^\s]+')
+
+# URL frame columns holding text; built straight into Arrow-backed strings
+# rather than object arrays of Python str
+URL_STRING_COLUMNS = frozenset({
+    'username', 'tweet_id', 'url', 'domain', 'raw_domain', 'protocol', 'path',
+    'query', 'fragment', 'title', 'description', 'content_type', 'error'
+})
+
+def _extract_tweet_urls(tweet_data: Dict) -> Set[str]:
+    """Extract URLs from a tweet object."""
+    urls = set()
+
+    # Extract from tweet text using regex; most tweets hold no link at all,
+    # and a substring test is far cheaper than running the regex over them
+    text = tweet_data.get('full_text')
+    if text and 'http' in text:
+        urls.update(TWEET_URL_PATTERN.findall(text))
+
+    # Extract from entities if present
+    if 'entities' in tweet_data and 'urls' in tweet_data['entities']:
+        for url_entity in tweet_data['entities']['urls']:
+            if 'expanded_url' in url_entity:
+                urls.add(url_entity['expanded_url'])
+            elif 'url' in url_entity:
+                urls.add(url_entity['url'])
+
+    return urls
+
+
+def _analyze_archive_file(archive_path: Path,
+                          domain_normalizer: DomainNormalizer) -> pd.DataFrame:
+    """Analyze URLs in a single archive file; errors propagate to the caller.
+
+    This is pure CPU work (parse, regex, urlparse) with no network access,
+    so it can run in worker processes.
+    """
+    with open(archive_path, 'rb') as f:
+        data = orjson.loads(f.read())
+
+    username = archive_path.stem.replace('_archive', '')
+    columns: Dict[str, list] = {key: [] for key in ARCHIVE_URL_COLUMNS}
+    created_ats = []
+
+    # Process tweets section
+    for tweet_data in data.get('tweets', []):
+        if 'tweet' in tweet_data:
+            tweet = tweet_data['tweet']
+            tweet_id = tweet.get('id_str')
+            # created_at stays a string here; the column is parsed in one pass below
+            created_at = tweet.get('created_at') or None
+
+            urls = _extract_tweet_urls(tweet)
+            for url in urls:
+                parsed = urlparse(url)
+                values = (
+                    username, tweet_id, url,
+                    domain_normalizer.normalize(parsed.netloc), parsed.netloc,
+                    parsed.scheme, parsed.path, parsed.query, parsed.fragment
+                )
+                for column, value in zip(columns.values(), values):
+                    column.append(value)
+                created_ats.append(created_at)
+
+    if not created_ats:
+        return pd.DataFrame()
+    # Build the columns as Arrow arrays and keep them Arrow-backed, so
+    # writing the frame to Parquet needs no object-to-Arrow conversion
+    table = pa.table({
+        'username': pa.array(columns['username'], pa.string()),
+        'tweet_id': pa.array(columns['tweet_id'], pa.string()),
+        'tweet_created_at': pc.strptime(
+            pa.array(created_ats, pa.string()), format=TWEET_TIME_FORMAT,
+            unit='us', error_is_null=True
+        ),
+        **{key: pa.array(columns[key], pa.string()) for key in ARCHIVE_URL_COLUMNS[2:]}
+    })
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _analyze_archive_or_empty(archive_path: Path,
+                              domain_normalizer: DomainNormalizer) -> pd.DataFrame:
+    """Analyze one archive as _analyze_archive_file does, logging any error.
+
+    Returns an empty frame for an archive that failed. Serial and worker
+    process runs both go through here, so failures are handled the same way.
+    """
+    try:
+        return _analyze_archive_file(archive_path, domain_normalizer)
+    except Exception as e:
+        logger.error(f"Error processing {archive_path}: {e}")
+        return pd.DataFrame()
+
+
 class URLAnalyzer:
     """Analyzes URLs in Twitter archive data."""
     
@@ -39,6 +147,8 @@ class URLAnalyzer:
             content_cache_dir = archive_dir / '.content_cache'
             
         self.content_analyzer = ContentAnalyzer(content_cache_dir)
+        # Resolved shortener URLs, kept on disk so re-runs skip the HEAD requests
+        self.resolved_urls = ContentCache(self.content_analyzer.cache_dir / 'resolved_urls.sqlite3')
         
         # Initialize archives list
         self.archives = []
@@ -55,7 +165,9 @@ class URLAnalyzer:
         """Initialize URL matching pattern."""
         self.url_pattern = re.compile(
             r'https?://(?:(?:www\.)?twitter\.com/[a-zA-Z0-9_]+/status/[0-9]+|'
-            r'(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+)'
+            # One character class rather than an alternation per character;
+            # '$-_' is a range that already covers digits, capitals and '%'
+            r'[a-zA-Z0-9$-_@.&+!*(),]+)'
         )
         
     def _setup_http_session(self):
@@ -80,11 +192,15 @@ class URLAnalyzer:
         self._url_cache: Dict[str, Optional[str]] = {}
         self._metadata_cache: Dict[str, URLMetadata] = {}
 
-    @functools.lru_cache(maxsize=10000)
     def resolve_url(self, short_url: str) -> Optional[str]:
         """Resolve a shortened URL by following redirects."""
         if short_url in self._url_cache:
             return self._url_cache[short_url]
+        
+        stored = self.resolved_urls.get(short_url.encode())
+        if stored is not None:
+            resolved_url = self._url_cache[short_url] = stored.decode()
+            return resolved_url
 
         try:
             response = self.session.head(
@@ -94,6 +210,11 @@ class URLAnalyzer:
             )
             resolved_url = response.url
             self._url_cache[short_url] = resolved_url
+            # Failures are only cached in memory so a later run retries them
+            self.resolved_urls.set(
+                short_url.encode(), resolved_url.encode(),
+                (datetime.now(timezone.utc) + RESOLVED_URL_TTL).timestamp()
+            )
             return resolved_url
         except Exception as e:
             logger.debug(f"Failed to resolve {short_url}: {e}")
@@ -102,64 +223,11 @@ class URLAnalyzer:
 
     def extract_urls_from_tweet(self, tweet_data: Dict) -> Set[str]:
         """Extract URLs from a tweet object."""
-        urls = set()
-        
-        # Extract from tweet text using regex
-        if 'full_text' in tweet_data:
-            text = tweet_data['full_text']
-            matches = re.findall(r'https?://[^\s]+', text)
-            urls.update(matches)
-        
-        # Extract from entities if present
-        if 'entities' in tweet_data and 'urls' in tweet_data['entities']:
-            for url_entity in tweet_data['entities']['urls']:
-                if 'expanded_url' in url_entity:
-                    urls.add(url_entity['expanded_url'])
-                elif 'url' in url_entity:
-                    urls.add(url_entity['url'])
-        
-        return urls
+        return _extract_tweet_urls(tweet_data)
     
     def analyze_archive(self, archive_path: Path) -> pd.DataFrame:
         """Analyze URLs in a single archive file."""
-        try:
-            with open(archive_path, 'rb') as f:
-                data = orjson.loads(f.read())
-            
-            url_data = []
-            username = archive_path.stem.replace('_archive', '')
-            
-            # Process tweets section
-            for tweet_data in data.get('tweets', []):
-                if 'tweet' in tweet_data:
-                    tweet = tweet_data['tweet']
-                    tweet_id = tweet.get('id_str')
-                    created_at = datetime.strptime(
-                        tweet.get('created_at', ''), 
-                        "%a %b %d %H:%M:%S %z %Y"
-                    ) if tweet.get('created_at') else None
-                    
-                    urls = self.extract_urls_from_tweet(tweet)
-                    for url in urls:
-                        parsed = urlparse(url)
-                        url_data.append({
-                            'username': username,
-                            'tweet_id': tweet_id,
-                            'tweet_created_at': created_at,
-                            'url': url,
-                            'domain': self.domain_normalizer.normalize(parsed.netloc),
-                            'raw_domain': parsed.netloc,
-                            'protocol': parsed.scheme,
-                            'path': parsed.path,
-                            'query': parsed.query,
-                            'fragment': parsed.fragment
-                        })
-            
-            return pd.DataFrame(url_data)
-            
-        except Exception as e:
-            logger.error(f"Error processing {archive_path}: {e}")
-            return pd.DataFrame()
+        return _analyze_archive_or_empty(archive_path, self.domain_normalizer)
 
     async def analyze_content(self, urls: List[str], url_pbar: Optional[tqdm] = None) -> Dict[str, 'PageContent']:
         """Analyze content of URLs concurrently."""
@@ -183,7 +251,7 @@ class URLAnalyzer:
         print(f"\nAnalyzing {total_urls} unique URLs...")
         
         url_data = []
-        async with aiohttp.ClientSession() as session:
+        async with self.content_analyzer.create_session() as session:
             # Create persistent progress bar
             with tqdm(total=total_urls, desc="Analyzing URLs") as url_pbar:
                 content_results = await self.content_analyzer.analyze_urls(
@@ -217,21 +285,31 @@ class URLAnalyzer:
         if not self.archives:
             return self._create_empty_dataframe()
         
-        url_data = []
-        for archive in self.archives:
-            try:
-                df = self.analyze_archive(archive)
-                if isinstance(df, pd.DataFrame) and not df.empty:
-                    url_data.append(df)
-            except Exception as e:
-                logger.error(f"Error processing archive {archive}: {e}")
-                continue
+        url_data = [df for df in self._iter_archive_frames() if not df.empty]
         
         if not url_data:
             return self._create_empty_dataframe()
         
         return pd.concat(url_data, ignore_index=True)
 
+    def _iter_archive_frames(self):
+        """Yield each archive's URL frame (empty if it failed) in archive order."""
+        # Same setting as the top-level analyzer; 1 or less stays in this process
+        processes = min(config.max_concurrent_processes, len(self.archives))
+        if processes <= 1:
+            for archive in self.archives:
+                yield self.analyze_archive(archive)
+            return
+        
+        # Archives are independent and parsing them is CPU-bound, so spread
+        # them over processes. Each worker gets a copy of this analyzer's
+        # domain normalizer
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(_analyze_archive_or_empty, archive, self.domain_normalizer)
+                       for archive in self.archives]
+            for future in tqdm(futures, desc="Analyzing archives"):
+                yield future.result()
+
     def _create_empty_dataframe(self) -> pd.DataFrame:
         """Create empty DataFrame with standard columns."""
         return pd.DataFrame(columns=[
@@ -254,51 +332,54 @@ class URLAnalyzer:
             tweets = data.get('tweets', [])
             total_tweets = len(tweets)
             
-            for i in range(0, total_tweets, self.batch_size):
-                batch_tweets = tweets[i:i + self.batch_size]
-                batch_urls = set()
-                batch_url_data = []
+            # One session for every batch so connections are reused
+            async with self.content_analyzer.create_session() as session:
+                for i in range(0, total_tweets, self.batch_size):
+                    batch_tweets = tweets[i:i + self.batch_size]
+                    batch_urls = set()
+                    batch_url_data = []
                 
-                # Extract URLs from batch
-                for tweet_data in batch_tweets:
-                    if 'tweet' in tweet_data:
-                        tweet = tweet_data['tweet']
-                        tweet_id = tweet.get('id_str')
-                        created_at = datetime.strptime(
-                            tweet.get('created_at', ''), 
-                            "%a %b %d %H:%M:%S %z %Y"
-                        ) if tweet.get('created_at') else None
+                    # Extract URLs from batch
+                    for tweet_data in batch_tweets:
+                        if 'tweet' in tweet_data:
+                            tweet = tweet_data['tweet']
+                            tweet_id = tweet.get('id_str')
+                            created_at = datetime.strptime(
+                                tweet.get('created_at', ''), 
+                                "%a %b %d %H:%M:%S %z %Y"
+                            ) if tweet.get('created_at') else None
                         
-                        urls = self.extract_urls_from_tweet(tweet)
-                        for url in urls:
-                            parsed = urlparse(url)
-                            batch_urls.add(url)
-                            batch_url_data.append({
-                                'username': username,
-                                'tweet_id': tweet_id,
-                                'tweet_created_at': created_at,
-                                'url': url,
-                                'domain': self.domain_normalizer.normalize(parsed.netloc),
-                                'raw_domain': parsed.netloc,
-                                'protocol': parsed.scheme,
-                                'path': parsed.path,
-                                'query': parsed.query,
-                                'fragment': parsed.fragment
-                            })
+                            urls = self.extract_urls_from_tweet(tweet)
+                            for url in urls:
+                                parsed = urlparse(url)
+                                batch_urls.add(url)
+                                batch_url_data.append({
+                                    'username': username,
+                                    'tweet_id': tweet_id,
+                                    'tweet_created_at': created_at,
+                                    'url': url,
+                                    'domain': self.domain_normalizer.normalize(parsed.netloc),
+                                    'raw_domain': parsed.netloc,
+                                    'protocol': parsed.scheme,
+                                    'path': parsed.path,
+                                    'query': parsed.query,
+                                    'fragment': parsed.fragment
+                                })
                 
-                # Filter out already processed URLs
-                new_urls = {url for url in batch_urls 
-                          if url not in self.content_analyzer.processed_urls or 
-                          datetime.now(timezone.utc) - self.content_analyzer.processed_urls[url] > self.content_analyzer.cache_ttl}
+                    # Filter out already processed URLs, against one cutoff
+                    # for the whole batch
+                    processed = self.content_analyzer.processed_urls
+                    cutoff = datetime.now(timezone.utc) - self.content_analyzer.cache_ttl
+                    new_urls = {url for url in batch_urls 
+                              if url not in processed or processed[url] < cutoff}
                 
-                # Process content for new URLs only
-                if new_urls:
-                    async with aiohttp.ClientSession() as session:
+                    # Process content for new URLs only
+                    if new_urls:
                         content_results = await self.content_analyzer.analyze_urls(
                             list(new_urls),
                             session=session
                         )
-                        
+                    
                         # Update URL data with content results
                         for url_entry in batch_url_data:
                             if url_entry['url'] in content_results:
@@ -311,10 +392,7 @@ class URLAnalyzer:
                                     'error': content.error
                                 })
                 
-                url_data.extend(batch_url_data)
-                
-                # Force garbage collection after each batch
-                gc.collect()
+                    url_data.extend(batch_url_data)
             
             return pd.DataFrame(url_data)
             
@@ -361,9 +439,9 @@ class URLAnalyzer:
                     if 'tweet' in tweet_data:
                         tweet = tweet_data['tweet']
                         # Extract from tweet text
-                        if 'full_text' in tweet:
-                            text_urls = self.url_pattern.findall(tweet['full_text'])
-                            urls.update(text_urls)
+                        text = tweet.get('full_text')
+                        if text and 'http' in text:
+                            urls.update(self.url_pattern.findall(text))
                         
                         # Extract from entities
                         if 'entities' in tweet and 'urls' in tweet['entities']:
@@ -392,23 +470,16 @@ class URLAnalyzer:
         if not archive_data:
             return pd.DataFrame()
             
-        # Process URLs for this archive
-        async with aiohttp.ClientSession() as session:
-            content_results = await self.content_analyzer.analyze_archive_urls(
-                archive_name,
-                list(archive_data.keys()),
-                session=session,
-                progress_callback=self._update_progress
-            )
+        # Process URLs for this archive on the analyzer's shared session so
+        # connections carry over from one archive to the next
+        content_results = await self.content_analyzer.analyze_archive_urls(
+            archive_name,
+            list(archive_data.keys()),
+            progress_callback=self._update_progress
+        )
             
-        # Create DataFrame entries
-        url_data = []
-        for url, content in content_results.items():
-            for context in archive_data[url]:
-                url_data.append(self._create_url_entry(url, content, context))
-                
         self.processed_archives.add(archive_name)
-        df = pd.DataFrame(url_data)
+        df = self._build_url_frame(content_results, archive_data)
         self.archive_results[archive_name] = df
         return df
         
@@ -449,25 +520,51 @@ class URLAnalyzer:
             ) if tweet.get('created_at') else None
         }
         
-    def _create_url_entry(self, url: str, content: PageContent, context: dict) -> dict:
-        """Create a dictionary entry for a URL."""
-        parsed = urlparse(url)
-        return {
-            **context,
-            'url': url,
-            'domain': self.domain_normalizer.normalize(parsed.netloc),
-            'raw_domain': parsed.netloc,
-            'protocol': parsed.scheme,
-            'path': parsed.path,
-            'query': parsed.query,
-            'fragment': parsed.fragment,
-            'title': content.title,
-            'description': content.description,
-            'content_type': content.content_type,
-            'status_code': content.status_code,
-            'error': content.error
-        }
+    def _build_url_frame(self, content_results: Dict[str, PageContent],
+                         archive_data: Dict[str, List[dict]]) -> pd.DataFrame:
+        """Build one row per (URL, tweet context) pair.
         
+        The frame is assembled column-wise: fields derived from the URL and its
+        content are computed once per URL and repeated for every tweet that
+        shared it, instead of building a dict per row.
+        """
+        context_keys = ('username', 'tweet_id', 'tweet_created_at')
+        columns: Dict[str, list] = {key: [] for key in context_keys}
+        url_columns: Dict[str, list] = {key: [] for key in (
+            'url', 'domain', 'raw_domain', 'protocol', 'path', 'query', 'fragment',
+            'title', 'description', 'content_type', 'status_code', 'error'
+        )}
+        
+        for url, content in content_results.items():
+            contexts = archive_data[url]
+            for key in context_keys:
+                columns[key].extend(context[key] for context in contexts)
+            
+            parsed = urlparse(url)
+            values = (
+                url, self.domain_normalizer.normalize(parsed.netloc), parsed.netloc,
+                parsed.scheme, parsed.path, parsed.query, parsed.fragment,
+                content.title, content.description, content.content_type,
+                content.status_code, content.error
+            )
+            repeat = len(contexts)
+            for column, value in zip(url_columns.values(), values):
+                column.extend([value] * repeat)
+        
+        if not columns['username']:
+            return pd.DataFrame()
+        columns.update(url_columns)
+        string_dtype = pd.ArrowDtype(pa.string())
+        return pd.DataFrame({
+            key: pd.array(values, dtype=string_dtype) if key in URL_STRING_COLUMNS else values
+            for key, values in columns.items()
+        })
+        
+    async def aclose(self) -> None:
+        """Release the content analyzer's shared HTTP session."""
+        self.resolved_urls.flush()
+        await self.content_analyzer.aclose()
+
     def get_archive_stats(self) -> pd.DataFrame:
         """Get statistics about processed archives."""
         stats = []
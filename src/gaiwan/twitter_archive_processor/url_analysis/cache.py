@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+
+class ContentCache:
+    """Key/value store for fetched page content backed by a single SQLite file.
+
+    Keeping every entry in one file avoids the per-URL open/close and inode
+    overhead of a file-per-URL layout. Each row carries its own expiry time,
+    so stale entries are filtered by the lookup itself.
+
+    Writes are grouped into transactions of ``commit_every`` rows; pending
+    rows are already visible to this instance's reads, and flush() commits
+    the remainder.
+    """
+
+    def __init__(self, db_path: Path, commit_every: int = 100):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_every = commit_every
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS content ("
+            "key BLOB PRIMARY KEY, expires REAL NOT NULL, value BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        # Don't lose a partial transaction if the cache is dropped or the
+        # interpreter exits without an explicit close()
+        self._finalizer = weakref.finalize(self, _commit_and_close, self._conn)
+
+    def get(self, key: bytes, allow_expired: bool = False) -> Optional[bytes]:
+        """Return the stored value for key, or None if missing or expired.
+
+        With allow_expired, stale values are returned too (e.g. as a base for
+        HTTP revalidation).
+        """
+        expires_after = float('-inf') if allow_expired else time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM content WHERE key = ? AND expires > ?",
+                (key, expires_after)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        """Return {key: value} for every key that is present and not expired."""
+        keys = list(keys)
+        found = {}
+        now = time.time()
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, value FROM content WHERE key IN ({placeholders}) AND expires > ?",
+                    (*chunk, now)
+                ).fetchall())
+        return found
+
+    def set(self, key: bytes, value: bytes, expires: float) -> None:
+        """Store value under key until the given Unix timestamp."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO content (key, expires, value) VALUES (?, ?, ?)",
+                (key, expires, value)
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._commit()
+
+    def flush(self) -> None:
+        """Commit any writes still pending."""
+        with self._lock:
+            self._commit()
+
+    def close(self) -> None:
+        """Commit pending writes and close the underlying database connection."""
+        with self._lock:
+            self._finalizer()
+
+    def _commit(self) -> None:
+        if self._pending:
+            self._conn.commit()
+            self._pending = 0
+
+
+def _commit_and_close(conn: sqlite3.Connection) -> None:
+    try:
+        conn.commit()
+    finally:
+        conn.close()
@@ -1,8 +1,12 @@
 from pathlib import Path
 import argparse
+import hashlib
 import logging
+import os
 from datetime import datetime, timezone
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from tqdm import tqdm
 from .analyzer import URLAnalyzer
 import asyncio
@@ -10,11 +14,20 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Low-cardinality string columns that compress well with dictionary encoding
+DICTIONARY_COLUMNS = ['domain', 'raw_domain', 'protocol', 'fetch_status']
+
+# String columns the reporter filters and counts; stored Arrow-backed so
+# value_counts/isin/str.contains run in native kernels
+REPORT_STRING_COLUMNS = ['url', 'domain', 'raw_domain', 'protocol', 'fetch_status', 'fetch_error']
+
 class URLAnalysisReporter:
     """Handles reporting and statistics for URL analysis results."""
     
     def __init__(self, df: pd.DataFrame, analyzer: URLAnalyzer):
-        self.df = df
+        self.df = df.astype({
+            col: pd.ArrowDtype(pa.string()) for col in REPORT_STRING_COLUMNS if col in df.columns
+        })
         self.analyzer = analyzer
         
     def print_overall_stats(self):
@@ -36,8 +49,11 @@ class URLAnalysisReporter:
             
     def print_domain_analysis(self):
         """Print analysis of different URL types and domains."""
-        # Create masks for different categories
-        unresolved_mask = (~self.df['is_resolved']) & (self.df['raw_domain'].isin(self.analyzer.domain_normalizer.shortener_domains))
+        # Create masks for different categories. Shortener membership is tested
+        # once per distinct domain and gathered back to rows by code.
+        codes, domains = pd.factorize(self.df['raw_domain'], use_na_sentinel=False)
+        is_shortener = np.asarray(pd.Index(domains).isin(self.analyzer.domain_normalizer.shortener_domains))
+        unresolved_mask = (~self.df['is_resolved']) & is_shortener.take(codes)
         twitter_internal_mask = self.df['url'].str.contains(r'https?://(?:(?:www\.|m\.)?twitter\.com|x\.com)/\w+/status/', na=False)
         
         # Separate dataframes
@@ -101,8 +117,8 @@ async def process_archives(analyzer, output_file: Path, force: bool = False,
     if not force and (existing_df := load_existing_data(output_file)) is not None:
         return existing_df
         
-    # Set up progress bars
-    total_archives = len(list(analyzer.archive_dir.glob("*.json")))
+    # Set up progress bars; the analyzer already discovered its archives
+    total_archives = len(analyzer.archives)
     with tqdm(total=total_archives, desc="Processing archives", position=0) as archive_pbar:
         def update_archive_progress(archive_name: str, current: int, total: int):
             archive_pbar.set_description(f"Processing archive: {archive_name}")
@@ -147,7 +163,10 @@ async def main():
     print("\nTop 10 domains:")
     print(domain_stats.head(10))
     
-    df = await process_archives(analyzer, output_file, args.force)
+    try:
+        df = await process_archives(analyzer, output_file, args.force)
+    finally:
+        await analyzer.aclose()
     if df is not None:
         reporter = URLAnalysisReporter(df, analyzer)
         reporter.print_overall_stats()
@@ -165,16 +184,38 @@ def load_existing_data(output_file: Path) -> pd.DataFrame:
             logger.error(f"Error loading existing data: {e}")
     return None
 
+def _file_digest(path: Path) -> bytes:
+    """Hash a file in 1 MiB chunks."""
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.digest()
+
 def save_results(df: pd.DataFrame, output_file: Path):
     """Save analysis results to file."""
-    if output_file.exists():
+    # Write next to the target and swap in atomically so an interrupted run
+    # never leaves a truncated output file behind
+    tmp_file = output_file.with_suffix('.parquet.tmp')
+    df.to_parquet(
+        tmp_file,
+        engine='pyarrow',
+        compression='zstd',
+        compression_level=3,
+        row_group_size=128_000,
+        use_dictionary=[col for col in DICTIONARY_COLUMNS if col in df.columns],
+        data_page_size=1 << 20
+    )
+    
+    # Only keep a backup when the previous results actually differ
+    if output_file.exists() and _file_digest(output_file) != _file_digest(tmp_file):
         backup_path = output_file.with_name(
             f"urls_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.parquet"
         )
         output_file.rename(backup_path)
         logger.info(f"Created backup at {backup_path}")
     
-    df.to_parquet(output_file)
+    os.replace(tmp_file, output_file)
     logger.info(f"Saved data to {output_file}")
 
 if __name__ == '__main__':
@@ -1,27 +1,155 @@
 import asyncio
+import codecs
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import itertools
 import aiohttp
 from bs4 import BeautifulSoup
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple, Union
 import logging
 from datetime import datetime, timezone, timedelta
 import hashlib
 from pathlib import Path
 import aiofiles
-import json
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 from urllib.parse import urlparse
 import re
 from tqdm import tqdm
 import ssl
-import gc
 from .apis.youtube import YouTubeAPI
 from .apis.config import Config
 from .apis.github import GitHubAPI
 from .apis.twitter import TwitterAPI
 from .models import PageContent
+from .cache import ContentCache
+from .limiter import AdaptiveLimiter
 import csv
 
 logger = logging.getLogger(__name__)
 
+# http(s) scheme followed by a non-empty host
+HTTP_URL_RE = re.compile(r'https?://[^/?#\s]')
+WHITESPACE_RE = re.compile(r'\s+')
+# Title, description and links all sit near the top of a page, so bodies are
+# only read up to this size
+MAX_HTML_BYTES = 2 * 1024 * 1024
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+    logger.debug("selectolax not installed. Falling back to BeautifulSoup for HTML parsing.")
+
+try:
+    import lxml  # noqa: F401  (only needed as a BeautifulSoup tree builder)
+    BS4_PARSER = 'lxml'
+except ImportError:
+    BS4_PARSER = 'html.parser'
+    logger.debug("lxml not installed. BeautifulSoup will use the pure-Python html.parser.")
+
+# aiohttp only decodes Brotli responses when one of these is importable, so
+# br is advertised only then
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+        logger.debug("brotli not installed. Requesting gzip/deflate encodings only.")
+
+@functools.lru_cache(maxsize=200000)
+def _has_scheme_and_netloc(url: str) -> bool:
+    """Full urlparse check, memoized since the same hrefs recur across pages."""
+    try:
+        result = urlparse(url)
+        return bool(result.scheme and result.netloc)
+    except Exception:
+        return False
+
+def _is_valid_url(url: str) -> bool:
+    """Check if URL is valid and absolute."""
+    if not url:
+        return False
+    # Nearly every href/src is plain http(s) or has no scheme at all;
+    # only the leftovers need a full parse
+    if HTTP_URL_RE.match(url):
+        return True
+    if ':' not in url:
+        return False
+    return _has_scheme_and_netloc(url)
+
+def _extract_main_content(doc: Union['LexborHTMLParser', BeautifulSoup]) -> str:
+    """Extract main text content, removing boilerplate."""
+    boilerplate = ['script', 'style', 'nav', 'header', 'footer']
+    if isinstance(doc, BeautifulSoup):
+        for element in doc(boilerplate):
+            element.decompose()
+        text = doc.get_text(separator=' ', strip=True)
+    else:
+        doc.strip_tags(boilerplate)
+        root = doc.body or doc.root
+        text = root.text(separator=' ', strip=True) if root else ''
+    
+    return WHITESPACE_RE.sub(' ', text).strip()
+
+def _parse_html(html: str, use_selectolax: bool) -> Tuple[Optional[str], Optional[str], str, Set[str], Set[str]]:
+    """Parse HTML into (title, description, text, links, images).
+    
+    A plain module-level function returning only builtins, so it can run in
+    a worker process as well as a thread.
+    """
+    if use_selectolax:
+        doc = LexborHTMLParser(html)
+        title_node = doc.css_first('title')
+        title = title_node.text() if title_node else None
+        
+        meta_desc = doc.css_first('meta[name="description"]')
+        description = meta_desc.attributes.get('content') if meta_desc else None
+        
+        nodes = ((node.tag, node.attributes) for node in doc.css('a[href], img[src]'))
+    else:
+        doc = BeautifulSoup(html, BS4_PARSER)
+        title_tag = doc.find('title')
+        # A NavigableString would keep the whole tree alive via its parents
+        title = str(title_tag.string) if title_tag and title_tag.string is not None else None
+        
+        description = None
+        meta_desc = doc.find('meta', attrs={'name': 'description'})
+        if meta_desc:
+            description = meta_desc.get('content')
+        
+        nodes = ((node.name, node.attrs) for node in doc.find_all(['a', 'img']))
+    
+    # Collect links and images in a single pass over the document
+    links, images = set(), set()
+    for tag, attrs in nodes:
+        if tag == 'a':
+            ref, target = attrs.get('href'), links
+        else:
+            ref, target = attrs.get('src'), images
+        if ref and _is_valid_url(ref):
+            target.add(ref)
+    
+    text = _extract_main_content(doc)
+    if not use_selectolax:
+        # Break the soup's parent/child cycles now instead of leaving them
+        # for the cyclic collector
+        doc.decompose()
+    return title, description, text, links, images
+
+def _apply_parsed(content: PageContent, parsed: Tuple) -> PageContent:
+    """Copy a _parse_html result onto content and return it."""
+    content.title, content.description, content.text_content, content.links, content.images = parsed
+    return content
+
 class ContentAnalyzer:
     """Asynchronous web content analyzer with caching."""
     
@@ -30,11 +158,25 @@ class ContentAnalyzer:
         self.cache_dir = Path(cache_dir or Path.home() / ".cache" / "twitter_archive_processor").resolve()
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"Using cache directory: {self.cache_dir}")
+        self.cache = ContentCache(self.cache_dir / 'content_cache.sqlite3')
         
         self.max_concurrent = 3
-        self.batch_size = 50  # Smaller batch size for content analysis
+        self.max_per_host = 2
         self.cache_ttl = timedelta(days=30)
         
+        # Set to False to force the BeautifulSoup path for HTML that
+        # selectolax handles badly
+        self.use_selectolax = SELECTOLAX_AVAILABLE
+        
+        # Worker processes for HTML parsing. 0 parses on the default thread
+        # pool; parsing holds the GIL, so on multi-core machines a process
+        # pool lets parsing scale past one core at the cost of pickling pages
+        self.parse_processes = 0
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        
+        # Shared session, created lazily by _get_session() and closed by aclose()
+        self._session: Optional[aiohttp.ClientSession] = None
+        
         # Longer timeout for rate-limited sites
         self.timeout = aiohttp.ClientTimeout(total=30, connect=10)
         
@@ -48,7 +190,7 @@ class ContentAnalyzer:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
             'DNT': '1',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
@@ -66,6 +208,7 @@ class ContentAnalyzer:
             'application/pdf', 'application/zip', 'image/', 'video/', 'audio/',
             'application/octet-stream', 'application/x-binary'
         }
+        self._skip_re = re.compile('|'.join(map(re.escape, self.skip_content_types)), re.IGNORECASE)
 
         # Load config and initialize APIs
         self.config = config or Config()
@@ -83,6 +226,9 @@ class ContentAnalyzer:
         self.url_log_path = self.cache_dir / 'processed_urls.csv'
         self.processed_urls = {}
         self._load_processed_urls()
+        # Log lines are buffered and appended in chunks rather than per URL
+        self._log_buffer: List[str] = []
+        self.log_flush_size = 256
         
         # Create the log file if it doesn't exist
         if not self.url_log_path.exists():
@@ -98,68 +244,204 @@ class ContentAnalyzer:
         if not self.url_log_path.exists():
             return
         
-        with open(self.url_log_path, 'r') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if len(row) >= 3 and row[2] == 'success':
-                    url, timestamp, _ = row
-                    self.processed_urls[url] = datetime.fromisoformat(timestamp)
+        # Arrow parses the log in native threads; rows that don't split into
+        # exactly three fields (e.g. unquoted commas in a URL) are skipped
+        try:
+            table = pa_csv.read_csv(
+                self.url_log_path,
+                read_options=pa_csv.ReadOptions(column_names=['url', 'timestamp', 'status']),
+                parse_options=pa_csv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+                convert_options=pa_csv.ConvertOptions(column_types={
+                    'url': pa.string(), 'timestamp': pa.string(), 'status': pa.string()
+                }),
+            )
+        except pa.ArrowInvalid as e:
+            # Raised for an empty file as well as a malformed one
+            logger.debug(f"Could not read {self.url_log_path}: {e}")
+            return
+        
+        # The header row carries status 'status' and drops out here too
+        table = table.filter(pc.equal(table['status'], 'success'))
+        
+        # URLs logged together share a timestamp, so convert each distinct
+        # value once and let every URL point at the same datetime object
+        encoded = pc.dictionary_encode(table['timestamp']).combine_chunks()
+        parsed = pd.to_datetime(
+            encoded.dictionary.to_pandas(), utc=True, format='ISO8601', errors='coerce'
+        )
+        stamps = [None if ts is pd.NaT else ts.to_pydatetime() for ts in parsed]
+        for url, code in zip(table['url'].to_pylist(), encoded.indices.to_pylist()):
+            timestamp = stamps[code]
+            if timestamp is not None:
+                self.processed_urls[url] = timestamp
+
+    def create_session(self) -> aiohttp.ClientSession:
+        """Create a ClientSession meant to be shared across many batches.
+        
+        Reusing one session keeps the connection pool, DNS cache and TLS
+        sessions warm instead of rebuilding them for every batch.
+        """
+        connector = aiohttp.TCPConnector(
+            ssl=self.ssl_context,
+            limit=self.max_concurrent * 4,
+            limit_per_host=8,
+            ttl_dns_cache=600,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True
+        )
+        return aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=self.timeout)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the analyzer's shared session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = self.create_session()
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the shared session and parse pool, and write out pending log and cache entries."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+        await self.flush_log()
+        self.cache.flush()
 
     async def analyze_urls(self, urls: List[str], session: Optional[aiohttp.ClientSession] = None, progress_callback=None) -> Dict[str, PageContent]:
-        """Analyze multiple URLs concurrently with optional progress callback."""
-        if session is None:
-            async with aiohttp.ClientSession() as new_session:
-                return await self._analyze_urls_internal(urls, new_session, progress_callback)
+        """Analyze multiple URLs concurrently with optional progress callback.
+        
+        Without an explicit session the analyzer's shared session is used, so
+        connections are kept between calls until aclose().
+        """
+        session = session or await self._get_session()
         return await self._analyze_urls_internal(urls, session, progress_callback)
 
     async def _analyze_urls_internal(self, urls: List[str], session: aiohttp.ClientSession, progress_callback=None) -> Dict[str, PageContent]:
-        results = {}
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        urls = self._unique_urls(urls, progress_callback)
+        results, urls = await self._take_cached(urls, progress_callback)
+        limiter = AdaptiveLimiter(self.max_concurrent, per_host=self.max_per_host)
         
-        for i in range(0, len(urls), self.batch_size):
-            batch = urls[i:i + self.batch_size]
-            batch_results = await self._process_batch(batch, session, semaphore, progress_callback)
-            results.update(batch_results)
-            gc.collect()
+        try:
+            # One sliding window over every miss: a slow URL no longer holds
+            # up the start of the next batch
+            await self._process_urls(urls, session, limiter, progress_callback, results)
+        finally:
+            await self.flush_log()
+            self.cache.flush()
         
         return results
 
-    async def _process_batch(self, urls: List[str], session: aiohttp.ClientSession, 
-                           semaphore: asyncio.Semaphore, progress_callback) -> Dict[str, PageContent]:
-        """Process a batch of URLs concurrently."""
-        results = {}
-        
-        async def process_url_with_semaphore(url: str):
-            async with semaphore:
-                result = await self.analyze_url(session, url)
-                results[url] = result
-                if progress_callback:
-                    progress_callback(1)
-                return result
-                
-        tasks = [process_url_with_semaphore(url) for url in urls]
-        await asyncio.gather(*tasks)
+    def _unique_urls(self, urls: List[str], progress_callback=None) -> List[str]:
+        """Drop repeated URLs, keeping first-seen order.
+        
+        Results are keyed by URL, so each duplicate would only repeat a cache
+        lookup or fetch. Duplicates are still reported as progress so callers'
+        totals line up.
+        """
+        unique = list(dict.fromkeys(urls))
+        if progress_callback and len(unique) < len(urls):
+            progress_callback(len(urls) - len(unique))
+        return unique
+
+    async def _take_cached(self, urls: List[str], progress_callback=None) -> Tuple[Dict[str, PageContent], List[str]]:
+        """Resolve cache hits up front so only misses compete for fetch slots.
+        
+        Returns the cached results and the URLs that still need fetching.
+        """
+        loop = asyncio.get_running_loop()
+        cached, misses = await loop.run_in_executor(None, self._bulk_load_cache, urls)
+        if cached:
+            await self._log_processed_urls(cached, 'success')
+            if progress_callback:
+                progress_callback(len(cached))
+        return cached, misses
+
+    def _bulk_load_cache(self, urls: List[str]) -> Tuple[Dict[str, PageContent], List[str]]:
+        """Look up many URLs in the cache with one query per chunk."""
+        keys = {url: self._cache_key(url) for url in urls}
+        found = self.cache.get_many(keys.values())
+        cached, misses = {}, []
+        for url, key in keys.items():
+            raw = found.get(key)
+            content = self._decode_cache_entry(raw) if raw is not None else None
+            if content is not None:
+                cached[url] = content
+            else:
+                misses.append(url)
+        return cached, misses
+
+    async def _process_urls(self, urls: List[str], session: aiohttp.ClientSession, 
+                          limiter: AdaptiveLimiter, progress_callback,
+                          results: Dict[str, PageContent]) -> Dict[str, PageContent]:
+        """Process URLs concurrently, adding them to results as they finish."""
+        async for url, result in self._iter_bounded(session, urls, limiter):
+            results[url] = result
+            if progress_callback:
+                progress_callback(1)
         return results
 
-    async def analyze_url(self, session: aiohttp.ClientSession, url: str) -> PageContent:
-        """Analyze a single URL, using API if available."""
-        # Check if URL was recently processed
-        if url in self.processed_urls:
-            last_processed = self.processed_urls[url]
-            if datetime.now(timezone.utc) - last_processed < self.cache_ttl:
-                logger.debug(f"Skipping recently processed URL: {url}")
-                cache_path = self._get_cache_path(url)
-                cached_content = await self._load_from_cache(cache_path)
-                if cached_content:
-                    return cached_content
+    async def _iter_bounded(self, session: aiohttp.ClientSession, urls: List[str],
+                            limiter: AdaptiveLimiter):
+        """Yield (url, content) as fetches finish.
+        
+        Tasks are created through a sliding window of twice the concurrency
+        limit, so a long URL list never materializes one task per URL.
+        """
+        window = limiter.max_limit * 2
+        remaining = iter(urls)
+        pending: Dict[asyncio.Future, str] = {}
+        try:
+            while True:
+                for url in itertools.islice(remaining, window - len(pending)):
+                    pending[asyncio.ensure_future(self._analyze_with_limit(session, url, limiter))] = url
+                if not pending:
+                    return
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield pending.pop(task), task.result()
+        finally:
+            for task in pending:
+                task.cancel()
 
-        cache_path = self._get_cache_path(url)
+    async def _analyze_with_limit(self, session: aiohttp.ClientSession, url: str,
+                                  limiter: AdaptiveLimiter) -> PageContent:
+        """Analyze a URL inside the concurrency limits and feed back rate limiting.
         
-        # Check cache first
-        cached_content = await self._load_from_cache(cache_path)
+        Never raises: an unexpected failure becomes an error PageContent for
+        that URL instead of aborting the rest of the run.
+        """
+        host = urlparse(url).netloc
+        # Wait on the host before taking a global slot so a backed-off host
+        # does not hold slots other hosts could use
+        async with limiter.host(host):
+            await limiter.wait_for_host(host)
+            async with limiter:
+                try:
+                    content = await self.analyze_url(session, url)
+                except Exception as e:
+                    logger.error(f"Failed to analyze {url}: {e}")
+                    return PageContent(url=url, error=str(e))
+        if content.status_code == 429:
+            limiter.back_off(host, self.rate_limits[429])
+            await limiter.throttle()
+        elif content.error is None:
+            await limiter.record_success()
+        return content
+
+    async def analyze_url(self, session: aiohttp.ClientSession, url: str) -> PageContent:
+        """Analyze a single URL, using API if available."""
+        # Hash and look up once; the processed-URL log only decides whether
+        # a hit needs logging again
+        cache_key = self._cache_key(url)
+        cached_content = await self._load_from_cache(cache_key)
         if cached_content:
-            await self._log_processed_url(url, 'success')
-            logger.debug(f"Cache hit for {url}")
+            last_processed = self.processed_urls.get(url)
+            if last_processed and datetime.now(timezone.utc) - last_processed < self.cache_ttl:
+                logger.debug(f"Skipping recently processed URL: {url}")
+            else:
+                await self._log_processed_url(url, 'success')
+                logger.debug(f"Cache hit for {url}")
             return cached_content
             
         # Try API-specific handlers first
@@ -169,44 +451,58 @@ class ContentAnalyzer:
             if self.youtube_api:
                 content = await self.youtube_api.process_url(url)
                 if content:
-                    await self._save_to_cache(cache_path, content)
+                    await self._save_to_cache(cache_key, content)
                     return content
                     
         if 'twitter.com' in domain or 'x.com' in domain:
             if self.twitter_api:
                 content = await self.twitter_api.process_url(url)
                 if content:
-                    await self._save_to_cache(cache_path, content)
+                    await self._save_to_cache(cache_key, content)
                     return content
                     
         if 'github.com' in domain:
             if self.github_api:
                 content = await self.github_api.process_url(url)
                 if content:
-                    await self._save_to_cache(cache_path, content)
+                    await self._save_to_cache(cache_key, content)
                     return content
         
         # Fall back to regular web scraping if no API available
         logger.debug(f"Cache miss for {url}")
         content = PageContent(url=url)
+        stale = await self._load_stale(cache_key)
+        request_headers = self._revalidation_headers(stale)
         for attempt in range(3):
             try:
-                async with session.get(url) as response:
+                async with session.get(url, headers=request_headers) as response:
+                    if response.status == 304 and stale is not None:
+                        # Unchanged since the stale entry; just renew it
+                        stale.fetch_time = datetime.now(timezone.utc)
+                        await self._save_to_cache(cache_key, stale)
+                        await self._log_processed_url(url, 'success')
+                        return stale
+                    
                     content.status_code = response.status
                     content.content_type = response.headers.get("content-type", "")
                     
                     # Skip binary content early
-                    if any(ct in content.content_type.lower() for ct in self.skip_content_types):
+                    if content.content_type and self._skip_re.search(content.content_type):
                         content.error = "Skipped binary content"
                         return content
 
                     if response.status == 200:
-                        try:
-                            text = await response.text()
-                            content = await self._parse_content(url, text, content.content_type)
+                        content_length = response.headers.get("content-length")
+                        if content_length and content_length.isdigit() and int(content_length) > MAX_HTML_BYTES:
+                            content.error = "Content too large"
                             return content
-                        except UnicodeDecodeError:
-                            content.error = "Text decode error"
+                        content.etag = response.headers.get("ETag")
+                        content.last_modified = response.headers.get("Last-Modified")
+                        text = await self._read_html(response)
+                        content = await self._parse_content(content, text)
+                        await self._save_to_cache(cache_key, content)
+                        await self._log_processed_url(url, 'success')
+                        return content
                     else:
                         content.error = f"HTTP {response.status}"
 
@@ -220,63 +516,49 @@ class ContentAnalyzer:
             if attempt < 2:
                 await asyncio.sleep(1 * (attempt + 1))
             
-        await self._save_to_cache(cache_path, content)
+        await self._save_to_cache(cache_key, content)
         await self._log_processed_url(url, 'failed')
         return content
 
-    async def _parse_content(self, url: str, content: str, content_type: str) -> PageContent:
-        """Parse HTML content and extract metadata."""
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Extract title
-        title = soup.title.string if soup.title else None
+    async def _read_html(self, response: aiohttp.ClientResponse) -> str:
+        """Read at most MAX_HTML_BYTES of the body and decode it."""
+        # Grow one buffer in place rather than joining a list of chunks
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(65536):
+            body += chunk
+            if len(body) >= MAX_HTML_BYTES:
+                del body[MAX_HTML_BYTES:]
+                break
         
-        # Extract description
-        description = None
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc:
-            description = meta_desc.get('content')
+        encoding = response.charset or 'utf-8'
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = 'utf-8'
+        return body.decode(encoding, errors='replace')
+
+    async def _parse_content(self, content: PageContent, html: str) -> PageContent:
+        """Parse HTML into an existing PageContent off the event loop and return it."""
+        loop = asyncio.get_running_loop()
+        if self.parse_processes <= 0:
+            return await loop.run_in_executor(None, self._parse_content_sync, content, html)
         
-        # Extract links
-        links = {a.get('href') for a in soup.find_all('a', href=True)}
-        links = {link for link in links if self._is_valid_url(link)}
-        
-        # Extract images
-        images = {img.get('src') for img in soup.find_all('img', src=True)}
-        images = {img for img in images if self._is_valid_url(img)}
-        
-        # Extract main text content
-        text_content = self._extract_main_content(soup)
-        
-        return PageContent(
-            url=url,
-            title=title,
-            description=description,
-            text_content=text_content,
-            links=links,
-            images=images,
-            content_type=content_type
-        )
+        if self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_processes)
+        parsed = await loop.run_in_executor(self._parse_pool, _parse_html, html, self.use_selectolax)
+        return _apply_parsed(content, parsed)
 
-    def _extract_main_content(self, soup: BeautifulSoup) -> str:
+    def _parse_content_sync(self, content: PageContent, html: str) -> PageContent:
+        """Parse HTML into an existing PageContent and return it."""
+        return _apply_parsed(content, _parse_html(html, self.use_selectolax))
+
+    def _extract_main_content(self, doc: Union['LexborHTMLParser', BeautifulSoup]) -> str:
         """Extract main text content, removing boilerplate."""
-        # Remove script and style elements
-        for element in soup(['script', 'style', 'nav', 'header', 'footer']):
-            element.decompose()
-        
-        # Get text and normalize whitespace
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        return text
+        return _extract_main_content(doc)
 
-    def _get_cache_path(self, url: str) -> Path:
-        """Generate a safe cache file path for a URL."""
-        # Create a safe filename from the URL
-        safe_name = hashlib.sha256(url.encode()).hexdigest()
-        return self.cache_dir / f"{safe_name}.json"
+    def _cache_key(self, url: str) -> bytes:
+        """Generate a compact cache key for a URL."""
+        return hashlib.blake2b(url.encode(), digest_size=16).digest()
 
     async def _log_processed_url(self, url: str, status: str) -> None:
         """Log URL processing status with timestamp."""
@@ -286,44 +568,91 @@ class ContentAnalyzer:
         if status == 'success':
             self.processed_urls[url] = timestamp
         
+        self._log_buffer.append(f"{url},{timestamp.isoformat()},{status}\n")
+        if len(self._log_buffer) >= self.log_flush_size:
+            await self.flush_log()
+
+    async def _log_processed_urls(self, urls: List[str], status: str) -> None:
+        """Log several URLs at once."""
+        timestamp = datetime.now(timezone.utc)
+        if status == 'success':
+            self.processed_urls.update(dict.fromkeys(urls, timestamp))
+        
+        stamp = timestamp.isoformat()
+        self._log_buffer.extend(f"{url},{stamp},{status}\n" for url in urls)
+        if len(self._log_buffer) >= self.log_flush_size:
+            await self.flush_log()
+
+    async def flush_log(self) -> None:
+        """Append buffered log lines to the processing log."""
+        if not self._log_buffer:
+            return
+        # Swap the buffer out before awaiting so concurrent loggers start a new one
+        lines, self._log_buffer = self._log_buffer, []
         async with aiofiles.open(self.url_log_path, 'a', newline='') as f:
-            await f.write(f"{url},{timestamp.isoformat()},{status}\n")
+            await f.write(''.join(lines))
 
-    async def _load_from_cache(self, cache_path: Path) -> Optional[PageContent]:
+    async def _load_from_cache(self, cache_key: bytes) -> Optional[PageContent]:
         """Load content from cache if available and not expired."""
+        loop = asyncio.get_running_loop()
         try:
-            if not cache_path.exists():
-                return None
-                
-            async with aiofiles.open(cache_path, 'r') as f:
-                cache_data = json.loads(await f.read())
+            # Expired rows are filtered out by the store itself
+            cached = await loop.run_in_executor(None, self.cache.get, cache_key)
+        except Exception as e:
+            logger.error(f"Failed to load cache entry {cache_key.hex()}: {e}")
+            return None
+        return self._decode_cache_entry(cached) if cached is not None else None
+
+    def _decode_cache_entry(self, raw: bytes) -> Optional[PageContent]:
+        """Rebuild a PageContent from a stored cache payload."""
+        try:
+            cache_data = orjson.loads(raw)
                 
             fetch_time = datetime.fromisoformat(cache_data['fetch_time'])
             if not fetch_time.tzinfo:
                 fetch_time = fetch_time.replace(tzinfo=timezone.utc)
-            
-            # Check if cache has expired
-            if (datetime.now(timezone.utc) - fetch_time) > self.cache_ttl:
-                logger.debug(f"Cache expired for {cache_data['url']}")
-                return None
+            cache_data['fetch_time'] = fetch_time
                 
-            # Create PageContent from cache data
-            return PageContent(
-                url=cache_data['url'],
-                title=cache_data.get('title'),
-                description=cache_data.get('description'),
-                content_type=cache_data.get('content_type'),
-                status_code=cache_data.get('status_code'),
-                error=cache_data.get('error'),
-                fetch_time=fetch_time
-            )
+            # Payload keys are PageContent field names, so it maps straight
+            # onto the constructor
+            return PageContent(**cache_data)
         except Exception as e:
-            logger.error(f"Failed to load cache from {cache_path}: {e}")
+            logger.error(f"Failed to decode cache entry: {e}")
             return None
 
-    async def _save_to_cache(self, cache_path: Path, content: PageContent) -> None:
-        """Save content to cache file."""
+    async def _load_stale(self, cache_key: bytes) -> Optional[PageContent]:
+        """Return an expired but successful cache entry, if any."""
+        loop = asyncio.get_running_loop()
         try:
+            cached = await loop.run_in_executor(None, self.cache.get, cache_key, True)
+        except Exception as e:
+            logger.error(f"Failed to load cache entry {cache_key.hex()}: {e}")
+            return None
+        if cached is None:
+            return None
+        stale = self._decode_cache_entry(cached)
+        if stale is None or stale.error or stale.status_code != 200:
+            return None
+        return stale
+
+    def _revalidation_headers(self, stale: Optional[PageContent]) -> Optional[Dict[str, str]]:
+        """Build conditional GET headers from a stale cache entry."""
+        if stale is None:
+            return None
+        headers = {}
+        if stale.etag:
+            headers['If-None-Match'] = stale.etag
+        if stale.last_modified:
+            headers['If-Modified-Since'] = stale.last_modified
+        return headers or None
+
+    async def _save_to_cache(self, cache_key: bytes, content: PageContent) -> None:
+        """Save content to the cache, expiring cache_ttl after it was fetched."""
+        loop = asyncio.get_running_loop()
+        try:
+            fetch_time = content.fetch_time or datetime.now(timezone.utc)
+            if not fetch_time.tzinfo:
+                fetch_time = fetch_time.replace(tzinfo=timezone.utc)
             cache_data = {
                 'url': content.url,
                 'title': content.title,
@@ -331,38 +660,35 @@ class ContentAnalyzer:
                 'content_type': content.content_type,
                 'status_code': content.status_code,
                 'error': content.error,
-                'fetch_time': content.fetch_time.isoformat() if content.fetch_time else datetime.now(timezone.utc).isoformat()
+                'fetch_time': fetch_time.isoformat(),
+                'etag': content.etag,
+                'last_modified': content.last_modified
             }
             
-            async with aiofiles.open(cache_path, 'w') as f:
-                await f.write(json.dumps(cache_data))
+            expires = (fetch_time + self.cache_ttl).timestamp()
+            # set() commits every few rows; keep that off the event loop
+            await loop.run_in_executor(None, self.cache.set,
+                                       cache_key, orjson.dumps(cache_data), expires)
             logger.debug(f"Cached content for {content.url}")
         except Exception as e:
             logger.error(f"Failed to cache content for {content.url}: {e}")
 
     def _is_valid_url(self, url: str) -> bool:
         """Check if URL is valid and absolute."""
-        try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc])
-        except Exception:
-            return False 
+        return _is_valid_url(url)
 
     async def analyze_archive_urls(self, archive_name: str, urls: List[str], 
                                  session: Optional[aiohttp.ClientSession] = None,
                                  progress_callback=None) -> Dict[str, PageContent]:
         """Analyze URLs from a specific archive."""
-        if session is None:
-            async with aiohttp.ClientSession() as new_session:
-                return await self._analyze_archive_urls_internal(archive_name, urls, new_session, progress_callback)
+        session = session or await self._get_session()
         return await self._analyze_archive_urls_internal(archive_name, urls, session, progress_callback)
 
     async def _analyze_archive_urls_internal(self, archive_name: str, urls: List[str], 
                                           session: aiohttp.ClientSession,
                                           progress_callback=None) -> Dict[str, PageContent]:
-        """Process URLs from a specific archive in batches."""
-        results = {}
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        """Process URLs from a specific archive."""
+        urls = self._unique_urls(urls, progress_callback)
         
         # Initialize stats for this archive
         self.archive_stats[archive_name] = {
@@ -372,34 +698,31 @@ class ContentAnalyzer:
             'errors': 0
         }
         
-        for i in range(0, len(urls), self.batch_size):
-            batch = urls[i:i + self.batch_size]
-            batch_results = await self._process_archive_batch(archive_name, batch, session, semaphore, progress_callback)
-            results.update(batch_results)
-            
-            # Update archive stats
-            self.archive_stats[archive_name]['processed'] += len(batch)
-            
-            # Optional garbage collection after each batch
-            gc.collect()
+        results, urls = await self._take_cached(urls, progress_callback)
+        self.archive_stats[archive_name]['cached'] = len(results)
+        self.archive_stats[archive_name]['processed'] = len(results)
+        limiter = AdaptiveLimiter(self.max_concurrent, per_host=self.max_per_host)
+        
+        try:
+            await self._process_archive_urls(archive_name, urls, session, limiter, progress_callback, results)
+        finally:
+            await self.flush_log()
+            self.cache.flush()
             
         return results
 
-    async def _process_archive_batch(self, archive_name: str, urls: List[str],
-                                   session: aiohttp.ClientSession,
-                                   semaphore: asyncio.Semaphore,
-                                   progress_callback) -> Dict[str, PageContent]:
-        """Process a batch of URLs from a specific archive."""
-        results = {}
-        
-        async def process_url_with_semaphore(url: str):
-            async with semaphore:
-                result = await self.analyze_url(session, url)
-                results[url] = result
-                if progress_callback:
-                    progress_callback(1)
-                return result
-        
-        tasks = [process_url_with_semaphore(url) for url in urls]
-        await asyncio.gather(*tasks)
+    async def _process_archive_urls(self, archive_name: str, urls: List[str],
+                                    session: aiohttp.ClientSession,
+                                    limiter: AdaptiveLimiter,
+                                    progress_callback,
+                                    results: Dict[str, PageContent]) -> Dict[str, PageContent]:
+        """Process URLs from a specific archive, adding them to results and stats."""
+        stats = self.archive_stats[archive_name]
+        async for url, result in self._iter_bounded(session, urls, limiter):
+            results[url] = result
+            stats['processed'] += 1
+            if result.error:
+                stats['errors'] += 1
+            if progress_callback:
+                progress_callback(1)
         return results 
\ No newline at end of file
@@ -1,3 +1,4 @@
+import re
 from dataclasses import dataclass, field
 from typing import Dict, Union, List, Callable, Set
 
@@ -6,46 +7,64 @@ class DomainNormalizer:
     
     def __init__(self):
         self.domain_mappings = {
-            'twitter.com': ['twitter.com', 'www.twitter.com', 'm.twitter.com'],
+            'twitter.com': ['twitter.com', 'www.twitter.com', 'm.twitter.com', 'x.com'],
             'youtube.com': ['youtube.com', 'www.youtube.com', 'youtu.be', 'm.youtube.com'],
             'wikipedia.org': ['wikipedia.org', 'en.wikipedia.org', 'fr.wikipedia.org', 'de.wikipedia.org'],
             'github.com': ['github.com', 'raw.githubusercontent.com', 'gist.github.com'],
-            'medium.com': lambda d: d.endswith('.medium.com'),
-            'substack.com': lambda d: d.endswith('.substack.com')
         }
         
+        # Any subdomain of these maps to the given normalized domain
+        self.suffix_mappings = {
+            'x.com': 'twitter.com',
+            'twitter.com': 'twitter.com',
+            'wikipedia.org': 'wikipedia.org',
+            'medium.com': 'medium.com',
+            'substack.com': 'substack.com',
+        }
+        
+        # Flattened lookups so normalize() is one dict hit plus one regex search
+        self._exact = {
+            variant: normalized
+            for normalized, variants in self.domain_mappings.items()
+            for variant in variants
+        }
+        self._suffix_re = re.compile(
+            r'\.(' + '|'.join(re.escape(s) for s in self.suffix_mappings) + r')$'
+        )
+        
+        # Archives repeat the same handful of domains; memoize per instance
+        self._normalized: Dict[str, str] = {}
+        
         # Known URL shortener domains
-        self.shortener_domains = {
+        self.shortener_domains = frozenset({
             't.co', 'bit.ly', 'goo.gl', 'tinyurl.com',
             'ow.ly', 'buff.ly', 'dlvr.it', 'is.gd',
             'tiny.cc', 'j.mp', 'ift.tt', 'amzn.to'
-        }
+        })
     
     def normalize(self, domain: str) -> str:
         """Normalize domain names."""
+        normalized = self._normalized.get(domain)
+        if normalized is None:
+            normalized = self._normalized[domain] = self._normalize(domain)
+        return normalized
+
+    def _normalize(self, domain: str) -> str:
+        """Normalize a domain without consulting the memo."""
         domain = domain.lower()
         if domain.startswith('www.'):
             domain = domain[4:]
-            
-        # Special case for Twitter/X domains
-        if domain == 'x.com' or domain.endswith('.x.com') or domain == 'twitter.com' or domain.endswith('.twitter.com'):
-            return 'twitter.com'
-            
-        # Check each mapping
-        for normalized, variants in self.domain_mappings.items():
-            if isinstance(variants, list):
-                if domain in variants:
-                    return normalized
-            elif callable(variants):
-                if variants(domain):
-                    return normalized
-            
-            # Special case for Wikipedia language subdomains
-            if normalized == 'wikipedia.org' and domain.endswith('.wikipedia.org'):
-                return normalized
-                
+        
+        normalized = self._exact.get(domain)
+        if normalized is not None:
+            return normalized
+        
+        match = self._suffix_re.search(domain)
+        if match:
+            return self.suffix_mappings[match.group(1)]
+        
         return domain
 
     def is_shortener(self, domain: str) -> bool:
         """Check if domain is a known URL shortener."""
-        return domain in self.shortener_domains
\ No newline at end of file
+        return domain in self.shortener_domains
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that can shrink and grow while a run is in flight.
+
+    Works like an asyncio.Semaphore used as ``async with limiter:``, but the
+    limit is an explicit counter guarded by a Condition so rate-limit
+    feedback can lower it (throttle) and sustained success can raise it back
+    towards the configured maximum.
+
+    It also hands out a small semaphore per host and tracks per-host backoff,
+    so one busy or rate-limiting site cannot occupy every global slot.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, grow_after: int = 20,
+                 per_host: int = 2):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.limit = max_limit
+        self.grow_after = grow_after
+        self.per_host = per_host
+        self._active = 0
+        self._successes = 0
+        self._cond = asyncio.Condition()
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+        self._host_resume: Dict[str, float] = {}
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+
+    async def throttle(self) -> None:
+        """Drop the limit by one after a rate-limit response."""
+        async with self._cond:
+            self._successes = 0
+            if self.limit > self.min_limit:
+                self.limit -= 1
+                logger.debug(f"Rate limited, concurrency lowered to {self.limit}")
+
+    async def record_success(self) -> None:
+        """Count a success and raise the limit after a sustained run of them."""
+        async with self._cond:
+            self._successes += 1
+            if self._successes >= self.grow_after and self.limit < self.max_limit:
+                self._successes = 0
+                self.limit += 1
+                self._cond.notify_all()
+
+    def host(self, host: str) -> asyncio.Semaphore:
+        """Return the semaphore limiting concurrent requests to one host."""
+        sem = self._host_sems.get(host)
+        if sem is None:
+            sem = self._host_sems[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    def back_off(self, host: str, delay: float) -> None:
+        """Hold further requests to host for delay seconds."""
+        resume = time.monotonic() + delay
+        if resume > self._host_resume.get(host, 0):
+            self._host_resume[host] = resume
+            logger.debug(f"Backing off {host} for {delay}s")
+
+    async def wait_for_host(self, host: str) -> None:
+        """Sleep until any backoff for host has passed."""
+        resume = self._host_resume.get(host)
+        if resume is not None:
+            delay = resume - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
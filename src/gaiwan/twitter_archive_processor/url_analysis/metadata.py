@@ -1,8 +1,10 @@
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
-@dataclass
+from .models import _SLOTS
+
+@dataclass(**_SLOTS)
 class URLMetadata:
     """Container for webpage metadata and fetch status."""
     url: str
@@ -17,6 +19,10 @@ class URLMetadata:
         'og_title': None,
         'og_description': None,
     })
+    # (last_fetch_time, its isoformat()) so repeated to_dict calls format once
+    _fetch_time_iso: Optional[Tuple[datetime, str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert metadata to dictionary for DataFrame storage."""
@@ -26,9 +32,19 @@ class URLMetadata:
             'content_type': self.content_type,
             'fetch_status': self.fetch_status,
             'fetch_error': self.fetch_error,
-            'last_fetch_time': self.last_fetch_time.isoformat() if self.last_fetch_time else None
+            'last_fetch_time': self._last_fetch_iso()
         }
 
+    def _last_fetch_iso(self) -> Optional[str]:
+        """Return last_fetch_time as an ISO string, formatting each timestamp once."""
+        if self.last_fetch_time is None:
+            return None
+        cached = self._fetch_time_iso
+        # Compare by identity so a reassigned timestamp is always reformatted
+        if cached is None or cached[0] is not self.last_fetch_time:
+            cached = self._fetch_time_iso = (self.last_fetch_time, self.last_fetch_time.isoformat())
+        return cached[1]
+
     def mark_skipped(self, reason: str) -> None:
         """Mark URL as skipped with a reason."""
         self.fetch_status = 'skipped'
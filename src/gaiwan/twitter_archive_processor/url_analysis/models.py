@@ -1,26 +1,30 @@
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from typing import Optional, Set, Dict
 from datetime import datetime, timezone
 
-@dataclass
+# __slots__ drops the per-instance __dict__; dataclass only supports it on 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+@dataclass(**_SLOTS)
 class PageContent:
     """Container for scraped webpage content and metadata."""
     url: str
     title: Optional[str] = None
     description: Optional[str] = None
     text_content: Optional[str] = None
-    links: Set[str] = None
-    images: Set[str] = None
-    fetch_time: datetime = None
+    links: Set[str] = field(default_factory=set)
+    images: Set[str] = field(default_factory=set)
+    fetch_time: datetime = field(default_factory=_utc_now)
     content_hash: Optional[str] = None
     content_type: Optional[str] = None
     status_code: Optional[int] = None
     error: Optional[str] = None
-
-    def __post_init__(self):
-        self.links = set() if self.links is None else self.links
-        self.images = set() if self.images is None else self.images
-        self.fetch_time = datetime.now(timezone.utc)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
     def to_dict(self) -> Dict:
         return {
@@ -34,5 +38,7 @@ class PageContent:
             'content_hash': self.content_hash,
             'content_type': self.content_type,
             'status_code': self.status_code,
-            'error': self.error
+            'error': self.error,
+            'etag': self.etag,
+            'last_modified': self.last_modified
         } 
\ No newline at end of file
@@ -1,25 +1,34 @@
 from pathlib import Path
+import asyncio
+import codecs
+import mmap
 import re
 from urllib.parse import urlparse
 from collections import Counter
-from typing import Dict, List, Set, Optional, Any
+from typing import Dict, List, Set, Optional, Any, Tuple, Union
 import orjson
 from tqdm import tqdm
 import logging
-from itertools import groupby
+from itertools import groupby, islice
 from operator import itemgetter
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from datetime import datetime, timezone
 import requests
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
-import functools
 from bs4 import BeautifulSoup
 import time
-from threading import Semaphore
+import uuid
+from threading import Lock, Semaphore
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from .config import config
 from .twitter_archive_processor.url_analysis.domain import DomainNormalizer
-from .twitter_archive_processor.url_analysis.content import ContentAnalyzer
+from .twitter_archive_processor.url_analysis.content import ContentAnalyzer, BS4_PARSER
+from .twitter_archive_processor.url_analysis.cache import ContentCache
+from .twitter_archive_processor.url_analysis.analyzer import RESOLVED_URL_TTL
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +54,8 @@ Usage:
 Features:
     - Resolves shortened URLs (t.co, bit.ly, etc.)
     - Normalizes domains (e.g., youtu.be -> youtube.com)
-    - Incremental processing (only analyzes new archives)
-    - Creates backups of existing analysis
+    - Incremental processing (only analyzes new or updated archives)
+    - Appends each run as a new part file; --force keeps a backup of the old output
     - Produces a pandas DataFrame with detailed URL data
 
 Output DataFrame columns:
@@ -63,7 +72,7 @@ Output DataFrame columns:
     - is_resolved: Whether URL was expanded from a shortener
 
 Example pandas queries:
-    # Load the data
+    # Load the data (a directory of part files)
     import pandas as pd
     df = pd.read_parquet('urls.parquet')
 
@@ -80,9 +89,221 @@ Example pandas queries:
     df.set_index('tweet_created_at')['domain'].resample('M').count()
 """
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+    logger.debug("selectolax not installed. Falling back to BeautifulSoup for HTML parsing.")
+
+try:
+    import httpx
+    import h2  # noqa: F401  (only needed for httpx's HTTP/2 support)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+    logger.debug("httpx[http2] not installed. Resolving shortened URLs with a thread pool.")
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+    logger.debug("ijson not installed. Large archives will be loaded whole.")
+
+# URLs ending in these are media/binary files with no page metadata to fetch
+SKIP_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.pdf', '.zip')
+
+# Archives larger than this are streamed tweet by tweet (when ijson is
+# available) instead of being loaded whole; below it one orjson call is faster
+STREAM_ARCHIVE_BYTES = 256 * 1024 * 1024
+
+# Page metadata all lives in <head>, so a page is only read up to its end
+# unless the full HTML is being stored
+HEAD_END_RE = re.compile(rb'</head\s*>', re.IGNORECASE)
+
+# Timestamp format of created_at in archive tweets
+TWEET_TIME_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+# Column types of the per-archive URL tables. Fixing them up front keeps
+# archives whose metadata columns happen to be all-null writable to the
+# same Parquet file as the rest
+URL_TABLE_SCHEMA = pa.schema([
+    ('username', pa.string()),
+    ('tweet_id', pa.string()),
+    ('tweet_created_at', pa.timestamp('us', tz='UTC')),
+    ('url', pa.string()),
+    ('domain', pa.string()),
+    ('raw_domain', pa.string()),
+    ('protocol', pa.string()),
+    ('path', pa.string()),
+    ('query', pa.string()),
+    ('fragment', pa.string()),
+    ('is_resolved', pa.bool_()),
+    ('title', pa.string()),
+    ('fetch_status', pa.string()),
+    ('fetch_error', pa.string()),
+    ('content_type', pa.string()),
+    ('last_fetch_time', pa.timestamp('us', tz='UTC')),
+    ('description', pa.string()),
+    ('keywords', pa.string()),
+    ('og_title', pa.string()),
+    ('og_description', pa.string()),
+])
+
+# Parquet settings for URL tables: zstd plus dictionary encoding for the
+# low-cardinality columns, which repeat the same few values across rows
+PARQUET_WRITE_OPTIONS = {
+    'compression': 'zstd',
+    'compression_level': 3,
+    'use_dictionary': ['username', 'domain', 'raw_domain', 'protocol', 'fetch_status'],
+    'data_page_size': 1 << 20,
+}
+
+# Splits a URL the way urlparse does (RFC 3986 appendix B, with urlparse's
+# ;params on the last path segment dropped), so a whole column can be split
+# by one Arrow kernel. Every group is optional, so every string matches.
+URL_PARTS_PATTERN = (
+    r'^(?:(?P<protocol>[A-Za-z][A-Za-z0-9+.-]*):)?'
+    r'(?://(?P<raw_domain>[^/?#]*))?'
+    r'(?P<path>[^?#]*?)(?:;[^/?#]*)?'
+    r'(?:\?(?P<query>[^#]*))?'
+    r'(?:#(?P<fragment>.*))?$'
+)
+
+# URLs in tweet text; better matches Twitter status links
+TWEET_URL_PATTERN = re.compile(
+    r'https?://(?:(?:www\.)?twitter\.com/[a-zA-Z0-9_]+/status/[0-9]+|'
+    # One character class rather than an alternation per character;
+    # '$-_' is a range that already covers digits, capitals and '%'
+    r'[a-zA-Z0-9$-_@.&+!*(),]+)'
+)
+
+# Known URL shorteners
+SHORTENER_DOMAINS = frozenset({
+    't.co',
+    'bit.ly',
+    'buff.ly',
+    'tinyurl.com',
+    'ow.ly',
+    'goo.gl',
+    'tiny.cc',
+    'is.gd',
+})
+
+# Shortened links are recognised by prefix rather than a urlparse per URL:
+# the scheme and host followed by the end of the netloc, or nothing at all
+SHORTENER_PREFIXES = tuple(
+    f'{scheme}://{domain}{end}'
+    for scheme in ('http', 'https')
+    for domain in SHORTENER_DOMAINS
+    for end in ('/', '?', '#')
+)
+SHORTENER_ROOTS = frozenset(
+    f'{scheme}://{domain}' for scheme in ('http', 'https') for domain in SHORTENER_DOMAINS
+)
+
+# Domain normalization rules, checked in order: a set of hosts or a predicate
+DOMAIN_GROUPS = {
+    'twitter.com': frozenset({'twitter.com', 'x.com', 'www.twitter.com', 'm.twitter.com'}),
+    'youtube.com': frozenset({'youtube.com', 'www.youtube.com', 'youtu.be', 'm.youtube.com'}),
+    'wikipedia.org': frozenset({
+        'wikipedia.org', 
+        'en.wikipedia.org', 'fr.wikipedia.org', 'de.wikipedia.org',
+        'en.m.wikipedia.org', 'fr.m.wikipedia.org', 'de.m.wikipedia.org',
+        'm.wikipedia.org'
+    }),
+    'substack.com': lambda domain: domain.endswith('.substack.com'),
+    'medium.com': lambda domain: domain.endswith('.medium.com'),
+    'github.com': frozenset({'github.com', 'raw.githubusercontent.com', 'gist.github.com', 'm.github.com'}),
+    'deprecated_links': SHORTENER_DOMAINS,
+}
+
+# DOMAIN_GROUPS flattened for lookup: host -> group for the host sets, and
+# the predicate groups kept in order as the fallback. No host in a set also
+# matches an earlier predicate, so checking the sets first keeps the result
+DOMAIN_ALIASES = {
+    alias: main_domain
+    for main_domain, matchers in reversed(DOMAIN_GROUPS.items()) if not callable(matchers)
+    for alias in matchers
+}
+DOMAIN_PREDICATES = tuple(
+    (main_domain, matchers) for main_domain, matchers in DOMAIN_GROUPS.items() if callable(matchers)
+)
+
+# (tweet_id, created_at, URLs found, entity URLs without an expanded_url)
+ParsedTweet = Tuple[Optional[str], Optional[str], Set[str], List[str]]
+
+
+def _split_tweet_urls(tweet_data: Dict, url_pattern=TWEET_URL_PATTERN) -> Tuple[Set[str], List[str]]:
+    """Return the URLs of a tweet that need no resolving, and the entity URLs that might."""
+    urls = set()
+    unexpanded = []
+    
+    # Twitter's URL entities already cover the links in the text (and expand
+    # them), so only scan the text when a tweet has none
+    url_entities = (tweet_data.get('entities') or {}).get('urls')
+    if not url_entities:
+        # Most tweets hold no link at all; a substring test is far cheaper
+        # than running the regex over them
+        text = tweet_data.get('text')
+        if text and 'http' in text:
+            urls.update(url_pattern.findall(text))
+        return urls, unexpanded
+    
+    for url_entity in url_entities:
+        # Use expanded_url if available (Twitter's pre-resolved version)
+        if 'expanded_url' in url_entity:
+            urls.add(url_entity['expanded_url'])
+        elif 'url' in url_entity:
+            unexpanded.append(url_entity['url'])
+    
+    return urls, unexpanded
+
+
+def _iter_archive_tweets(archive_path: Path):
+    """Yield the entries of an archive's 'tweets' list.
+
+    Large archives are streamed with ijson so only one tweet is held in
+    memory at a time rather than the whole parsed file.
+    """
+    if IJSON_AVAILABLE and archive_path.stat().st_size > STREAM_ARCHIVE_BYTES:
+        with open(archive_path, 'rb') as f:
+            yield from ijson.items(f, 'tweets.item')
+        return
+    
+    # Parse straight from the page cache rather than a read() copy of the file
+    with open(archive_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            data = orjson.loads(view)
+    yield from data.get('tweets', [])
+
+
+def _parse_archive(archive_path: Path) -> List[ParsedTweet]:
+    """Parse an archive file and pull the URLs out of each of its tweets.
+
+    This is the CPU-bound part of analyzing an archive and touches no network
+    or shared state, so it runs in worker processes.
+    """
+    parsed = []
+    for tweet_data in _iter_archive_tweets(archive_path):
+        if 'tweet' in tweet_data:
+            tweet = tweet_data['tweet']
+            # created_at stays a string here; the column is parsed in one pass later
+            parsed.append((
+                tweet.get('id_str'), tweet.get('created_at') or None,
+                *_split_tweet_urls(tweet)
+            ))
+    return parsed
+
+
 class PageMetadata:
     """Container for webpage metadata and fetch status."""
     
+    # One instance is cached per URL, so skip the per-instance __dict__
+    __slots__ = ('url', 'title', 'fetch_status', 'fetch_error', 'content_type',
+                 'last_fetch_time', 'metadata', 'html_content')
+    
     def __init__(self, url: str):
         self.url = url
         self.title: Optional[str] = None
@@ -99,6 +320,9 @@ class PageMetadata:
             'og_description': None,  # For future OpenGraph description
             # Add more metadata fields as needed
         }
+        
+        # Raw page HTML, only kept when store_html is enabled
+        self.html_content: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert metadata to dictionary for DataFrame storage."""
@@ -130,8 +354,20 @@ class PageMetadata:
         self.fetch_error = None
         self.last_fetch_time = datetime.now(timezone.utc)
 
-    def extract_metadata(self, soup: BeautifulSoup) -> None:
-        """Extract metadata from BeautifulSoup object."""
+    def extract_metadata(self, soup: Union[BeautifulSoup, 'LexborHTMLParser']) -> None:
+        """Extract metadata from a BeautifulSoup or selectolax document."""
+        if not isinstance(soup, BeautifulSoup):
+            for key, selector in (
+                ('description', 'meta[name="description"]'),
+                ('keywords', 'meta[name="keywords"]'),
+                ('og_title', 'meta[property="og:title"]'),
+                ('og_description', 'meta[property="og:description"]'),
+            ):
+                node = soup.css_first(selector)
+                if node:
+                    self.metadata[key] = node.attributes.get('content')
+            return
+        
         # Extract meta description
         meta_desc = soup.find('meta', attrs={'name': 'description'})
         if meta_desc:
@@ -181,16 +417,23 @@ class RateLimiter:
     """Rate limiter for controlling request frequency."""
     def __init__(self, max_requests_per_second: int):
         self.semaphore = Semaphore(max_requests_per_second)
+        self.interval = 1.0 / max_requests_per_second
         self.last_request_time = 0
+        self._lock = Lock()
         self.retry_policy = DomainRetryPolicy()
         
     def acquire(self, domain: str = None):
-        """Acquire a permit, waiting if necessary."""
+        """Acquire a permit, waiting if necessary.
+
+        Request starts are spaced so that at most max_requests_per_second
+        begin each second, however many threads are fetching.
+        """
         self.semaphore.acquire()
-        current_time = time.time()
-        if current_time - self.last_request_time < 1.0:
-            time.sleep(1.0 - (current_time - self.last_request_time))
-        self.last_request_time = time.time()
+        with self._lock:
+            current_time = time.time()
+            if current_time - self.last_request_time < self.interval:
+                time.sleep(self.interval - (current_time - self.last_request_time))
+            self.last_request_time = time.time()
         
     def release(self):
         """Release a permit."""
@@ -230,6 +473,8 @@ class URLAnalyzer:
             content_cache_dir = archive_dir / '.content_cache'
             
         self.content_analyzer = ContentAnalyzer(content_cache_dir)
+        # Resolved shortener URLs, kept on disk so re-runs skip the HEAD requests
+        self.resolved_urls = ContentCache(self.content_analyzer.cache_dir / 'resolved_urls.sqlite3')
         
         # Initialize archives list
         self.archives = []
@@ -248,33 +493,9 @@ class URLAnalyzer:
         self.compress_html = config.compress_html
         self.clean_html = config.clean_html
 
-        # Add domain normalization rules
-        self.domain_groups = {
-            'twitter.com': ['twitter.com', 'x.com', 'www.twitter.com', 'm.twitter.com'],
-            'youtube.com': ['youtube.com', 'www.youtube.com', 'youtu.be', 'm.youtube.com'],
-            'wikipedia.org': [
-                'wikipedia.org', 
-                'en.wikipedia.org', 'fr.wikipedia.org', 'de.wikipedia.org',
-                'en.m.wikipedia.org', 'fr.m.wikipedia.org', 'de.m.wikipedia.org',
-                'm.wikipedia.org'
-            ],
-            'substack.com': lambda domain: domain.endswith('.substack.com'),
-            'medium.com': lambda domain: domain.endswith('.medium.com'),
-            'github.com': ['github.com', 'raw.githubusercontent.com', 'gist.github.com', 'm.github.com'],
-            'deprecated_links': lambda domain: domain in self.shortener_domains,
-        }
-
-        # Add known URL shorteners
-        self.shortener_domains = {
-            't.co',
-            'bit.ly',
-            'buff.ly',
-            'tinyurl.com',
-            'ow.ly',
-            'goo.gl',
-            'tiny.cc',
-            'is.gd',
-        }
+        # Domain normalization rules and known URL shorteners (shared, read-only)
+        self.domain_groups = DOMAIN_GROUPS
+        self.shortener_domains = SHORTENER_DOMAINS
 
         # Set up requests session with retries
         self.session = requests.Session()
@@ -283,8 +504,17 @@ class URLAnalyzer:
             backoff_factor=0.5,
             status_forcelist=[429, 500, 502, 503, 504]
         )
-        self.session.mount('http://', HTTPAdapter(max_retries=retries))
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        # Size the connection pool for concurrent metadata fetches and resolution
+        adapter = HTTPAdapter(
+            max_retries=retries,
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.fetch_workers = config.max_requests_per_second
+        # Shortener HEAD requests aren't rate limited; bound them by the pool size
+        self.resolve_workers = min(32, config.pool_maxsize)
         
         # Cache for resolved URLs and metadata
         self._url_cache: Dict[str, Optional[str]] = {}
@@ -306,10 +536,7 @@ class URLAnalyzer:
     def _setup_url_pattern(self):
         """Set up the URL pattern for extracting URLs from tweets."""
         # Improved URL pattern to better match Twitter URLs
-        self.url_pattern = re.compile(
-            r'https?://(?:(?:www\.)?twitter\.com/[a-zA-Z0-9_]+/status/[0-9]+|'
-            r'(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+)'
-        )
+        self.url_pattern = TWEET_URL_PATTERN
 
     def _setup_http_session(self):
         """Set up the HTTP session with retries and headers."""
@@ -320,8 +547,17 @@ class URLAnalyzer:
             backoff_factor=0.5,
             status_forcelist=[429, 500, 502, 503, 504]
         )
-        self.session.mount('http://', HTTPAdapter(max_retries=retries))
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        # Size the connection pool for concurrent metadata fetches and resolution
+        adapter = HTTPAdapter(
+            max_retries=retries,
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.fetch_workers = config.max_requests_per_second
+        # Shortener HEAD requests aren't rate limited; bound them by the pool size
+        self.resolve_workers = min(32, config.pool_maxsize)
         
         # Set a reasonable timeout for requests
         self.timeout = config.request_timeout
@@ -338,9 +574,18 @@ class URLAnalyzer:
         # Cache for resolved URLs and metadata
         self._url_cache: Dict[str, Optional[str]] = {}
         self._metadata_cache: Dict[str, 'PageMetadata'] = {}
+        # Archives repeat the same handful of hosts
+        self._domain_cache: Dict[str, str] = {}
 
     def normalize_domain(self, domain: str) -> str:
         """Normalize domain names to group related sites."""
+        normalized = self._domain_cache.get(domain)
+        if normalized is None:
+            normalized = self._domain_cache[domain] = self._normalize_domain(domain)
+        return normalized
+
+    def _normalize_domain(self, domain: str) -> str:
+        """Normalize a domain without consulting the cache."""
         # Remove www. prefix for consistency
         domain = domain.lower().replace('www.', '')
         
@@ -353,22 +598,26 @@ class URLAnalyzer:
                 parts.pop(m_index)
                 domain = '.'.join(parts)
         
-        # Check each domain group
-        for main_domain, matchers in self.domain_groups.items():
-            if callable(matchers):
-                # Function matcher for pattern matching (e.g., *.substack.com)
-                if matchers(domain):
-                    return main_domain
-            elif domain in matchers:
+        # Check the domain groups: one lookup for the listed hosts, then the
+        # pattern matchers (e.g., *.substack.com)
+        main_domain = DOMAIN_ALIASES.get(domain)
+        if main_domain is not None:
+            return main_domain
+        for main_domain, matches in DOMAIN_PREDICATES:
+            if matches(domain):
                 return main_domain
         
         return domain
 
-    @functools.lru_cache(maxsize=10000)
     def resolve_url(self, short_url: str) -> Optional[str]:
         """Resolve a shortened URL by following redirects."""
         if short_url in self._url_cache:
             return self._url_cache[short_url]
+        
+        stored = self.resolved_urls.get(short_url.encode())
+        if stored is not None:
+            resolved_url = self._url_cache[short_url] = stored.decode()
+            return resolved_url
 
         try:
             response = self.session.head(
@@ -376,54 +625,70 @@ class URLAnalyzer:
                 allow_redirects=True,
                 timeout=5
             )
-            resolved_url = response.url
-            self._url_cache[short_url] = resolved_url
-            return resolved_url
+            return self._store_resolution(short_url, response.url)
         except Exception as e:
             logger.debug(f"Failed to resolve {short_url}: {e}")
             self._url_cache[short_url] = None
             return None
 
+    def _store_resolution(self, short_url: str, resolved_url: str) -> str:
+        """Cache a successful resolution in memory and in the persistent store."""
+        self._url_cache[short_url] = resolved_url
+        # Failures are only cached in memory so a later run retries them
+        self.resolved_urls.set(
+            short_url.encode(), resolved_url.encode(),
+            (datetime.now(timezone.utc) + RESOLVED_URL_TTL).timestamp()
+        )
+        return resolved_url
+
+    async def _resolve_many_http2(self, urls: List[str]) -> None:
+        """Resolve shortened URLs over multiplexed HTTP/2 connections.
+
+        Shortened links mostly point at a handful of shortener hosts, so one
+        HTTP/2 connection per host carries many requests at once where the
+        thread pool needs a connection per in-flight request.
+        """
+        limit = asyncio.Semaphore(self.resolve_workers)
+        limits = httpx.Limits(max_connections=self.resolve_workers,
+                              max_keepalive_connections=self.resolve_workers)
+        async with httpx.AsyncClient(http2=True, follow_redirects=True, timeout=5,
+                                     limits=limits, headers=dict(self.session.headers)) as client:
+            async def resolve(short_url: str) -> None:
+                async with limit:
+                    try:
+                        response = await client.head(short_url)
+                        self._store_resolution(short_url, str(response.url))
+                    except Exception as e:
+                        logger.debug(f"Failed to resolve {short_url}: {e}")
+                        self._url_cache[short_url] = None
+            
+            await asyncio.gather(*(resolve(url) for url in urls))
+
     def should_resolve_url(self, url: str) -> bool:
         """Check if URL should be resolved."""
-        try:
-            parsed = urlparse(url)
-            return parsed.netloc in self.shortener_domains
-        except Exception:
-            return False
+        return url.startswith(SHORTENER_PREFIXES) or url in SHORTENER_ROOTS
 
     def extract_urls_from_tweet(self, tweet_data: Dict) -> Set[str]:
         """Extract URLs from a tweet object."""
-        urls = set()
-        
-        # Extract from tweet text
-        if 'text' in tweet_data:
-            urls.update(self.url_pattern.findall(tweet_data['text']))
-        
-        # Extract from entities if present
-        if 'entities' in tweet_data:
-            entities = tweet_data['entities']
-            if 'urls' in entities:
-                for url_entity in entities['urls']:
-                    # Use expanded_url if available (Twitter's pre-resolved version)
-                    if 'expanded_url' in url_entity:
-                        urls.add(url_entity['expanded_url'])
-                    elif 'url' in url_entity:
-                        short_url = url_entity['url']
-                        if self.should_resolve_url(short_url):
-                            logger.debug(f"Attempting to resolve shortened URL: {short_url}")
-                            resolved = self.resolve_url(short_url)
-                            if resolved:
-                                logger.debug(f"Successfully resolved {short_url} -> {resolved}")
-                                urls.add(resolved)
-                            else:
-                                logger.debug(f"Failed to resolve shortened URL: {short_url}")
-                                urls.add(short_url)  # Keep the original shortened URL
-                        else:
-                            urls.add(short_url)
-
+        urls, unexpanded = _split_tweet_urls(tweet_data, self.url_pattern)
+        self._add_unexpanded_urls(urls, unexpanded)
         return urls
 
+    def _add_unexpanded_urls(self, urls: Set[str], unexpanded: List[str]) -> None:
+        """Add entity URLs lacking an expanded_url to urls, resolving shortened ones."""
+        for short_url in unexpanded:
+            if self.should_resolve_url(short_url):
+                logger.debug(f"Attempting to resolve shortened URL: {short_url}")
+                resolved = self.resolve_url(short_url)
+                if resolved:
+                    logger.debug(f"Successfully resolved {short_url} -> {resolved}")
+                    urls.add(resolved)
+                else:
+                    logger.debug(f"Failed to resolve shortened URL: {short_url}")
+                    urls.add(short_url)  # Keep the original shortened URL
+            else:
+                urls.add(short_url)
+
     def get_page_metadata(self, url: str) -> 'PageMetadata':
         """Fetch and extract metadata from a webpage."""
         if url in self._metadata_cache:
@@ -435,7 +700,7 @@ class URLAnalyzer:
         
         try:
             # Don't try to get metadata from certain file types
-            if any(url.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.pdf', '.zip']):
+            if url.lower().endswith(SKIP_EXTENSIONS):
                 metadata.mark_skipped(f"Skipping media file")
                 self._metadata_cache[url] = metadata
                 return metadata
@@ -448,7 +713,10 @@ class URLAnalyzer:
                 return metadata
 
             self.rate_limiter.acquire(domain)
-            response = self.session.get(url, timeout=self.timeout, stream=True)
+            try:
+                response = self.session.get(url, timeout=self.timeout, stream=True)
+            finally:
+                self.rate_limiter.release()
             response.raise_for_status()
             
             # Check if it's HTML content
@@ -458,8 +726,17 @@ class URLAnalyzer:
                 self._metadata_cache[url] = metadata
                 return metadata
             
-            # Read the complete content
-            content = response.text
+            # Read the complete content only when it is stored; the metadata
+            # needs just the <head>. Decode it here rather than via
+            # response.text, which assumes ISO-8859-1 for text/html without a
+            # charset and falls back to slow charset detection otherwise
+            body = response.content if self.store_html else _read_html_head(response)
+            encoding = response.encoding if 'charset=' in content_type else None
+            try:
+                codecs.lookup(encoding or 'utf-8')
+            except LookupError:
+                encoding = None
+            content = body.decode(encoding or 'utf-8', errors='replace')
             
             # Store HTML if enabled
             if self.store_html:
@@ -473,13 +750,19 @@ class URLAnalyzer:
                     
                 metadata.html_content = content
             
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(content, 'html.parser')
+            # Parse with selectolax when available, BeautifulSoup otherwise
+            if SELECTOLAX_AVAILABLE:
+                soup = LexborHTMLParser(content)
+                title_tag = soup.css_first('title')
+                title = title_tag.text() if title_tag else None
+            else:
+                soup = BeautifulSoup(content, BS4_PARSER)
+                title_tag = soup.find('title')
+                title = title_tag.text if title_tag else None
             
             # Extract title - handle case where title tag doesn't exist
-            title_tag = soup.find('title')
-            if title_tag and title_tag.text:
-                metadata.title = title_tag.text.strip()
+            if title:
+                metadata.title = title.strip()
             else:
                 metadata.title = url  # Fallback to URL if no title found
             
@@ -510,118 +793,323 @@ class URLAnalyzer:
             self._metadata_cache[url] = metadata
             return metadata
 
+    def _resolve_short_urls(self, urls) -> None:
+        """Resolve uncached shortened URLs concurrently, filling the URL cache."""
+        pending = [url for url in dict.fromkeys(urls)
+                   if url not in self._url_cache and self.should_resolve_url(url)]
+        if not pending:
+            return
+        # Take what earlier runs already resolved in one query
+        stored = self.resolved_urls.get_many(url.encode() for url in pending)
+        for key, value in stored.items():
+            self._url_cache[key.decode()] = value.decode()
+        pending = [url for url in pending if url not in self._url_cache]
+        if pending and HTTP2_AVAILABLE and not _in_event_loop():
+            asyncio.run(self._resolve_many_http2(pending))
+        else:
+            with ThreadPoolExecutor(max_workers=self.resolve_workers) as executor:
+                for _ in executor.map(self.resolve_url, pending):
+                    pass
+        self.resolved_urls.flush()
+
+    def _prefetch_metadata(self, urls) -> None:
+        """Fetch metadata for uncached URLs concurrently, filling the cache."""
+        pending = [url for url in dict.fromkeys(urls) if url not in self._metadata_cache]
+        if not pending:
+            return
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            for _ in tqdm(executor.map(self.get_page_metadata, pending), total=len(pending),
+                          desc="Fetching metadata", position=1, leave=False):
+                pass
+
     def analyze_archive(self, archive_path: Path) -> pd.DataFrame:
         """Analyze URLs in a single archive file."""
+        table = self._analyze_archive_table(archive_path)
+        return (table if table is not None else pa.table({})).to_pandas()
+
+    def _analyze_archive_table(self, archive_path: Path,
+                               parsed: Optional[List[ParsedTweet]] = None) -> Optional[pa.Table]:
+        """Analyze URLs in a single archive file into an Arrow table.
+
+        parsed, if given, is the archive already run through _parse_archive
+        (e.g. in a worker process); otherwise the file is parsed here.
+        Returns None if the archive could not be analyzed.
+        """
         try:
-            with open(archive_path, 'rb') as f:
-                data = orjson.loads(f.read())
+            if parsed is None:
+                parsed = _parse_archive(archive_path)
             
-            url_data = []
             username = archive_path.stem.replace('_archive', '')
-            tweets = data.get('tweets', [])
             
-            # Add progress bar for tweets within this archive
-            with tqdm(total=len(tweets), desc="Processing tweets", position=1, leave=False) as tweet_pbar:
-                for tweet_data in tweets:
-                    if 'tweet' in tweet_data:
-                        tweet = tweet_data['tweet']
-                        tweet_id = tweet.get('id_str')
-                        created_at = datetime.strptime(
-                            tweet.get('created_at', ''), 
-                            "%a %b %d %H:%M:%S %z %Y"
-                        ) if tweet.get('created_at') else None
-                        
-                        urls = self.extract_urls_from_tweet(tweet)
-                        for url in urls:
-                            parsed = urlparse(url)
-                            # Get metadata for the URL
-                            metadata = self.get_page_metadata(url)
-                            metadata_dict = metadata.to_dict()
-                            
-                            url_data.append({
-                                'username': username,
-                                'tweet_id': tweet_id,
-                                'tweet_created_at': created_at,
-                                'url': url,
-                                'domain': self.normalize_domain(parsed.netloc),
-                                'raw_domain': parsed.netloc,
-                                'protocol': parsed.scheme,
-                                'path': parsed.path,
-                                'query': parsed.query,
-                                'fragment': parsed.fragment,
-                                'is_resolved': False,  # Will be updated if URL is resolved
-                                **metadata_dict  # Add all metadata fields
-                            })
-                        
-                        # Update progress after each tweet
-                        tweet_pbar.update(1)
-                        # Periodically update description to show URL count
-                        if len(url_data) % 100 == 0 and url_data:
-                            tweet_pbar.set_description(f"Processing tweets ({len(url_data)} URLs found)")
+            # Shortened links without an expanded_url are resolved before
+            # they're added; resolve them concurrently up front so that hits the cache
+            self._resolve_short_urls(url for *_, unexpanded in parsed for url in unexpanded)
             
+            # Collect the URLs first so their metadata can be fetched concurrently
+            tweet_urls = []
+            for tweet_id, created_at, urls, unexpanded in parsed:
+                self._add_unexpanded_urls(urls, unexpanded)
+                tweet_urls.append((tweet_id, created_at, urls))
+            
+            # One row per (tweet, URL): keep the tweet context per row and an
+            # index into a table holding everything that depends only on the URL
+            tweet_ids, created_ats, url_indices = [], [], []
+            url_index: Dict[str, int] = {}
+            for tweet_id, created_at, urls in tweet_urls:
+                for url in urls:
+                    index = url_index.get(url)
+                    if index is None:
+                        index = url_index[url] = len(url_index)
+                    tweet_ids.append(tweet_id)
+                    created_ats.append(created_at)
+                    url_indices.append(index)
+            if not url_indices:
+                return pa.table({})
+            
+            self._prefetch_metadata(url_index)
             # Process URL resolution if needed
-            for url_data_item in url_data:
-                if url_data_item['is_resolved'] == False:
-                    url = url_data_item['url']
-                    if self.should_resolve_url(url):
-                        logger.debug(f"Attempting to resolve shortened URL: {url}")
-                        resolved = self.resolve_url(url)
-                        if resolved:
-                            logger.debug(f"Successfully resolved {url} -> {resolved}")
-                            url_data_item['is_resolved'] = True
-                            url_data_item['url'] = resolved
-                        else:
-                            logger.debug(f"Failed to resolve shortened URL: {url}")
-                            url_data_item['is_resolved'] = False
+            self._resolve_short_urls(url_index)
+            
+            resolutions = []
+            metadata_columns: Dict[str, list] = {}
+            for url in url_index:
+                resolved = None
+                if self.should_resolve_url(url):
+                    logger.debug(f"Attempting to resolve shortened URL: {url}")
+                    resolved = self.resolve_url(url)
+                    if resolved:
+                        logger.debug(f"Successfully resolved {url} -> {resolved}")
                     else:
-                        url_data_item['is_resolved'] = False
+                        logger.debug(f"Failed to resolve shortened URL: {url}")
+                
+                resolutions.append(resolved or None)
+                # Metadata is for the URL as found in the tweet
+                for key, value in self.get_page_metadata(url).to_dict().items():
+                    metadata_columns.setdefault(key, []).append(value)
             
-            return pd.DataFrame(url_data)
+            # Split every URL into its parts in one pass, then normalize each
+            # distinct host once
+            found_urls = pa.array(list(url_index), pa.string())
+            parts = pc.extract_regex(found_urls, URL_PARTS_PATTERN)
+            resolutions = pa.array(resolutions, pa.string())
+            raw_domains = parts.field('raw_domain').dictionary_encode()
+            domains = pa.array(
+                [self.normalize_domain(netloc) for netloc in raw_domains.dictionary.to_pylist()],
+                pa.string()
+            ).take(raw_domains.indices)
+            
+            # Expand the per-URL columns to one row per tweet in a single take
+            url_table = pa.table({
+                'url': pc.coalesce(resolutions, found_urls),
+                'domain': domains,
+                'raw_domain': raw_domains.dictionary_decode(),
+                'protocol': pc.utf8_lower(parts.field('protocol')),
+                'path': parts.field('path'),
+                'query': parts.field('query'),
+                'fragment': parts.field('fragment'),
+                'is_resolved': resolutions.is_valid(),
+                **metadata_columns
+            }).take(pa.array(url_indices))
+            return pa.table({
+                'username': pa.array([username] * len(url_indices), pa.string()),
+                'tweet_id': tweet_ids,
+                'tweet_created_at': pc.strptime(
+                    pa.array(created_ats, pa.string()), format=TWEET_TIME_FORMAT,
+                    unit='us', error_is_null=True
+                ),
+                **{name: url_table.column(name) for name in url_table.column_names}
+            }).cast(URL_TABLE_SCHEMA)
             
         except Exception as e:
             logger.error(f"Error processing {archive_path}: {e}")
-            return pd.DataFrame()
+            return None
 
-    def analyze_archives(self) -> pd.DataFrame:
-        """Analyze URLs across all archives."""
-        dfs = []
-        archives = list(self.archive_dir.glob("*_archive.json"))
-        
-        # Add main progress bar for archives
-        with tqdm(total=len(archives), desc="Analyzing archives", position=0) as archive_pbar:
+    def _iter_parsed_archives(self, archives: List[Path]):
+        """Yield (archive_path, parsed tweets or the exception raised) in input order.
+
+        Archives are parsed in worker processes while the caller does the
+        network-bound part for earlier ones. Shortener resolution and metadata
+        fetches stay in this process so they share its caches and rate limiter.
+        At most 2x max_workers parses are in flight, which bounds the parsed
+        archives held in memory ahead of the caller. A single archive, or
+        max_concurrent_processes <= 1, is parsed in this process instead.
+        """
+        if len(archives) <= 1 or config.max_concurrent_processes <= 1:
             for archive_path in archives:
-                username = archive_path.stem.replace('_archive', '')
-                archive_pbar.set_description(f"Analyzing archive: {username}")
-                
-                df = self.analyze_archive(archive_path)
-                if not df.empty:
-                    dfs.append(df)
+                try:
+                    yield archive_path, _parse_archive(archive_path)
+                except Exception as e:
+                    yield archive_path, e
+            return
+
+        max_workers = config.max_concurrent_processes
+        archive_iter = iter(archives)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(path, executor.submit(_parse_archive, path))
+                       for path in islice(archive_iter, 2 * max_workers)]
+            while futures:
+                archive_path, future = futures.pop(0)
+                try:
+                    yield archive_path, future.result()
+                except Exception as e:
+                    yield archive_path, e
+                for path in islice(archive_iter, 1):
+                    futures.append((path, executor.submit(_parse_archive, path)))
+
+    def analyze_archives(self, archives: Optional[List[Path]] = None) -> pd.DataFrame:
+        """Analyze URLs across the given archives, or every archive in archive_dir."""
+        return self._analyze_archives(archives)[0]
+
+    def _analyze_archives(self, archives: Optional[List[Path]] = None
+                          ) -> Tuple[pd.DataFrame, List[Path]]:
+        """Analyze archives as analyze_archives does.
+
+        Also returns the archives that were analyzed, leaving out any that
+        failed to parse or analyze.
+        """
+        # Per-archive results stay in Arrow; concat_tables only chains their
+        # chunks, so the final frame needs no pandas concat
+        tables = []
+        analyzed = []
+        if archives is None:
+            archives = list(self.archive_dir.glob("*_archive.json"))
+        
+        # Stream each archive into the output file as its own row group rather
+        # than rewriting everything so far after every archive
+        writer = None
+        temp_file = None
+        if getattr(self, 'output_file', None):
+            # Write to a temp file to avoid corrupting the main file if interrupted
+            # (dot-prefixed and not *.parquet, so dataset readers skip a leftover one)
+            temp_file = self.output_file.with_name(f".{self.output_file.name}.tmp")
+        
+        try:
+            # Add main progress bar for archives
+            with tqdm(total=len(archives), desc="Analyzing archives", position=0) as archive_pbar:
+                for archive_path, parsed in self._iter_parsed_archives(archives):
+                    username = archive_path.stem.replace('_archive', '')
+                    archive_pbar.set_description(f"Analyzing archive: {username}")
                     
-                    # Save incremental results after each archive
-                    if hasattr(self, 'output_file') and self.output_file:
-                        # Create combined DataFrame with all processed archives so far
-                        combined_df = pd.concat(dfs, ignore_index=True)
+                    if isinstance(parsed, Exception):
+                        logger.error(f"Error processing {archive_path}: {parsed}")
+                        table = None
+                    else:
+                        table = self._analyze_archive_table(archive_path, parsed)
+                    if table is not None:
+                        analyzed.append(archive_path)
+                    if table is not None and table.num_rows:
+                        tables.append(table)
                         
-                        # Create temp file to avoid corrupting the main file if interrupted
-                        temp_file = self.output_file.with_name(f"{self.output_file.stem}_temp.parquet")
-                        combined_df.to_parquet(temp_file)
+                        if temp_file is not None:
+                            if writer is None:
+                                writer = pq.ParquetWriter(temp_file, URL_TABLE_SCHEMA, **PARQUET_WRITE_OPTIONS)
+                            writer.write_table(table)
+                            logger.info(f"Wrote results for {username}. Total URLs: {sum(t.num_rows for t in tables)}")
                         
-                        # Safely rename to the actual output file
-                        if temp_file.exists():
-                            if self.output_file.exists():
-                                self.output_file.unlink()  # Remove existing file
-                            temp_file.rename(self.output_file)
-                            
-                        logger.info(f"Saved incremental results after processing {username}. Total URLs: {len(combined_df)}")
-                    
-                archive_pbar.update(1)
+                    archive_pbar.update(1)
+        finally:
+            # Closing writes the footer, so even an interrupted run leaves a
+            # readable file with every archive finished so far
+            if writer is not None:
+                writer.close()
+                temp_file.replace(self.output_file)
         
-        # Combine all DataFrames
-        if dfs:
-            combined_df = pd.concat(dfs, ignore_index=True)
+        # Convert to pandas once, at the end
+        if tables:
+            combined = pa.concat_tables(tables)
+            del tables
+            combined_df = combined.to_pandas(self_destruct=True, types_mapper=pd.ArrowDtype)
+            del combined
             logger.info(f"\nAnalysis complete. DataFrame shape: {combined_df.shape}")
-            return combined_df
-        return pd.DataFrame()
+            return combined_df, analyzed
+        return pd.DataFrame(), analyzed
+
+def _migrate_legacy_output(output_dir: Path) -> None:
+    """Turn a single-file output from older runs into the first part of output_dir."""
+    if not output_dir.is_file():
+        return
+    legacy = output_dir.rename(output_dir.with_name(f"{output_dir.name}.legacy"))
+    output_dir.mkdir()
+    legacy.rename(output_dir / 'part-legacy.parquet')
+    logger.info(f"Moved existing results into {output_dir}")
+
+
+def _drop_archive_rows(output_dir: Path, usernames: Set[str],
+                       keep: Optional[Path] = None) -> None:
+    """Remove the rows of the given archives from every part file that has any.
+
+    keep, if given, is a part file left untouched (e.g. the one just written).
+    """
+    if not usernames:
+        return
+    value_set = pa.array(sorted(usernames), pa.string())
+    for part in sorted(output_dir.glob('*.parquet')):
+        if part == keep:
+            continue
+        # Check the username column alone; only affected parts are read in full
+        stale = pc.is_in(pq.read_table(part, columns=['username']).column('username'), value_set=value_set)
+        if not pc.any(stale).as_py():
+            continue
+        table = pq.read_table(part).filter(pc.invert(stale))
+        if table.num_rows:
+            temp_file = part.with_name(f".{part.name}.tmp")
+            pq.write_table(table, temp_file, row_group_size=128_000, **PARQUET_WRITE_OPTIONS)
+            temp_file.replace(part)
+        else:
+            part.unlink()
+
+
+def _read_html_head(response: requests.Response, chunk_size: int = 16384) -> bytes:
+    """Read a streamed HTML response up to the end of its <head>, then close it."""
+    body = bytearray()
+    try:
+        for chunk in response.iter_content(chunk_size):
+            # Look back far enough to catch a tag split across chunks
+            start = max(0, len(body) - 16)
+            body += chunk
+            if HEAD_END_RE.search(body, start):
+                break
+    finally:
+        response.close()
+    return bytes(body)
+
+
+def _in_event_loop() -> bool:
+    """Return whether this thread is already running an asyncio event loop."""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _manifest_path(output_file: Path) -> Path:
+    """Return the sidecar file recording which archives output_file covers."""
+    return output_file.with_suffix('.manifest.json')
+
+
+def load_manifest(output_file: Path) -> Optional[Dict[str, float]]:
+    """Load {archive file name: mtime} for the archives in output_file, if recorded."""
+    try:
+        with open(_manifest_path(output_file), 'rb') as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"Error loading archive manifest: {e}")
+        return None
+
+
+def save_manifest(output_file: Path, archives: List[Path],
+                  previous: Optional[Dict[str, float]] = None) -> None:
+    """Record the archives (and their mtimes) that output_file now covers.
+
+    previous holds entries for archives kept from an earlier run.
+    """
+    manifest = dict(previous or {})
+    manifest.update((archive.name, archive.stat().st_mtime) for archive in archives)
+    _manifest_path(output_file).write_bytes(orjson.dumps(manifest))
+
 
 class TqdmLoggingHandler(logging.Handler):
     """Logging handler that works with tqdm progress bars."""
@@ -638,22 +1126,26 @@ def main():
     
     This function provides a CLI for analyzing URLs in Twitter archives.
     It supports incremental processing, meaning it will only analyze new
-    archives not present in existing output file.
+    archives (or ones updated since) not present in the existing output.
+    
+    The output is a directory of Parquet part files, one per run, which
+    pd.read_parquet reads as a single table.
     
     Arguments:
         archive_path: Path to either a directory containing Twitter archives or a single archive file
         --debug: Enable debug logging
-        --output_file: Custom output file path (default: urls.parquet)
+        --output_file: Custom output directory (default: urls.parquet)
         --force: Force reanalysis of all archives
         --content_cache_dir: Directory to store content cache (default: archive_path/.content_cache)
     
     The function will:
-    1. Check for existing analysis file (urls.parquet)
-    2. Load and process only new archives
-    3. Merge results with existing data
-    4. Create backup of existing analysis
-    5. Save updated analysis
-    6. Print summary statistics
+    1. Check the manifest of archives already in the output (urls.manifest.json)
+    2. Analyze only new and updated archives into a new part file
+    3. Drop earlier rows of the archives analyzed from the existing parts
+    4. Update the manifest with the archives analyzed
+    5. Print summary statistics for the archives analyzed
+    
+    With --force, an existing output is moved aside as a backup first.
     """
     import argparse
     parser = argparse.ArgumentParser(description="Analyze URLs in Twitter archives")
@@ -673,31 +1165,24 @@ def main():
     logger = logging.getLogger(__name__)
     logger.info(f"Starting URL analysis for {args.archive_path}")
     
-    # Initialize analyzer with output file if provided
-    content_cache_dir = args.content_cache_dir or args.archive_path / '.content_cache'
-    analyzer = URLAnalyzer(archive_dir=args.archive_path, content_cache_dir=content_cache_dir)
-    if args.output_file:
-        analyzer.output_file = args.output_file
-        logger.info(f"Results will be saved to: {args.output_file}")
-    
     # Add tqdm-compatible handler
     tqdm_handler = TqdmLoggingHandler()
     tqdm_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
     logging.getLogger().addHandler(tqdm_handler)
 
-    output_file = args.output_file or Path('urls.parquet')
-    existing_df = None
-    processed_archives = set()
-
-    # Load existing data if available
-    if not args.force and output_file.exists():
-        try:
-            existing_df = pd.read_parquet(output_file)
-            processed_archives = set(existing_df['username'].unique())
-            logger.info(f"Loaded existing data with {len(existing_df)} URLs from {len(processed_archives)} archives")
-        except Exception as e:
-            logger.error(f"Error loading existing data: {e}")
-            existing_df = None
+    output_dir = args.output_file or Path('urls.parquet')
+    logger.info(f"Results will be saved to: {output_dir}")
+    
+    if args.force and output_dir.exists():
+        # Create backup of existing results
+        backup_path = output_dir.with_name(
+            f"{output_dir.stem}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.parquet"
+        )
+        output_dir.rename(backup_path)
+        logger.info(f"Created backup at {backup_path}")
+    _migrate_legacy_output(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = None if args.force else load_manifest(output_dir)
 
     # Handle both file and directory inputs
     archive_path = args.archive_path
@@ -710,34 +1195,41 @@ def main():
         archives = list(analyzer.archive_dir.glob("*_archive.json"))
     
     # Filter out already processed archives
-    if existing_df is not None and not args.force:
-        new_archives = [
-            a for a in archives 
-            if a.stem.replace('_archive', '') not in processed_archives
-        ]
-        if not new_archives:
-            logger.info("No new archives to process")
-            df = existing_df
+    new_archives = archives
+    if any(output_dir.glob('*.parquet')):
+        if manifest is not None:
+            # The manifest also catches archives updated since they were analyzed
+            new_archives = [a for a in archives if manifest.get(a.name, 0) < a.stat().st_mtime]
         else:
-            logger.info(f"Found {len(new_archives)} new archives to process")
-            archives = new_archives
-            # Analyze new archives
-            df = analyzer.analyze_archives()
-            
-            if df.empty:
-                logger.error("No data found in new archives")
-                return
-
-            # Merge with existing data
-            df = pd.concat([existing_df, df], ignore_index=True)
-            logger.info(f"Merged new data. Total URLs: {len(df)}")
-    else:
-        # Analyze all archives
-        df = analyzer.analyze_archives()
-        
-        if df.empty:
-            logger.error("No data found in archives")
-            return
+            # Older output without a manifest: only the username column is needed
+            usernames = pq.read_table(output_dir, columns=['username']).column('username')
+            processed_archives = set(pc.unique(usernames).to_pylist())
+            new_archives = [
+                a for a in archives 
+                if a.stem.replace('_archive', '') not in processed_archives
+            ]
+    
+    if not new_archives:
+        logger.info("No new archives to process")
+        return
+    logger.info(f"Found {len(new_archives)} new archives to process")
+    
+    # Analyze new archives, streaming them into this run's part file
+    analyzer.output_file = output_dir / f"part-{uuid.uuid4().hex}.parquet"
+    df, analyzed = analyzer._analyze_archives(new_archives)
+    
+    # Now that their new rows are written, drop the earlier rows of archives
+    # analyzed again (e.g. updated ones); failed archives keep theirs
+    _drop_archive_rows(output_dir, {a.stem.replace('_archive', '') for a in analyzed},
+                       keep=analyzer.output_file)
+    # Archives that failed stay out of the manifest so the next run retries them
+    pending = set(new_archives)
+    skipped = [a for a in archives if a not in pending]
+    save_manifest(output_dir, skipped + analyzed, manifest)
+    if df.empty:
+        logger.error("No data found in new archives")
+        return
+    logger.info(f"Saved data to {analyzer.output_file}")
 
     # Print summary statistics
     print("\nOverall Statistics:")
@@ -789,21 +1281,5 @@ def main():
     print("\nProtocols used:")
     print(df['protocol'].value_counts())
 
-    # Save DataFrame
-    if args.output_file:
-        output_path = args.output_file
-    else:
-        # Create backup of existing file
-        if output_file.exists():
-            backup_path = output_file.with_name(
-                f"urls_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.parquet"
-            )
-            output_file.rename(backup_path)
-            logger.info(f"Created backup at {backup_path}")
-        output_path = output_file
-
-    df.to_parquet(output_path)
-    logger.info(f"Saved data to {output_path}")
-
 if __name__ == '__main__':
     main() 
\ No newline at end of file
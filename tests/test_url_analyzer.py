@@ -0,0 +1,124 @@
+"""Tests for the incremental url_analyzer command-line run."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from gaiwan import url_analyzer
+from gaiwan.config import config
+from gaiwan.url_analyzer import (
+    PageMetadata, URLAnalyzer, _drop_archive_rows, _migrate_legacy_output,
+    load_manifest, save_manifest
+)
+
+
+def write_archive(path: Path, urls):
+    """Write an archive with one tweet per URL."""
+    tweets = [{
+        "tweet": {
+            "id_str": str(i),
+            "full_text": f"Link {url}",
+            "created_at": "Wed Oct 10 20:19:24 +0000 2018",
+            "entities": {"urls": [{"url": url, "expanded_url": url}]}
+        }
+    } for i, url in enumerate(urls)]
+    path.write_text(json.dumps({"tweets": tweets}))
+
+
+def bump_mtime(path: Path):
+    """Make path look modified since it was last analyzed."""
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+@pytest.fixture
+def run_main(tmp_path, monkeypatch):
+    """Run main() over tmp_path/archives without touching the network."""
+    archive_dir = tmp_path / "archives"
+    archive_dir.mkdir()
+    output_dir = tmp_path / "urls.parquet"
+    monkeypatch.setattr(URLAnalyzer, 'get_page_metadata', lambda self, url: PageMetadata(url))
+    monkeypatch.setattr(config, 'max_concurrent_processes', 1)
+    monkeypatch.setattr(sys, 'argv', [
+        'url_analyzer', str(archive_dir), '--output_file', str(output_dir),
+        '--content_cache_dir', str(tmp_path / 'cache')
+    ])
+    return archive_dir, output_dir, url_analyzer.main
+
+
+def test_migrate_legacy_output(tmp_path):
+    output = tmp_path / "urls.parquet"
+    pq.write_table(pa.table({'username': ['alice']}), output)
+
+    _migrate_legacy_output(output)
+    assert output.is_dir()
+    assert pq.read_table(output / 'part-legacy.parquet').column('username').to_pylist() == ['alice']
+
+    # Already a directory: nothing to do
+    _migrate_legacy_output(output)
+    assert [p.name for p in output.iterdir()] == ['part-legacy.parquet']
+
+
+def test_drop_archive_rows(tmp_path):
+    pq.write_table(pa.table({'username': ['alice', 'bob'], 'url': ['a', 'b']}),
+                   tmp_path / 'part-1.parquet')
+    pq.write_table(pa.table({'username': ['bob']}), tmp_path / 'part-2.parquet')
+    pq.write_table(pa.table({'username': ['bob'], 'url': ['c']}), tmp_path / 'part-3.parquet')
+
+    _drop_archive_rows(tmp_path, {'bob'}, keep=tmp_path / 'part-3.parquet')
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['part-1.parquet', 'part-3.parquet']
+    assert pq.read_table(tmp_path / 'part-1.parquet').to_pylist() == [{'username': 'alice', 'url': 'a'}]
+    assert pq.read_table(tmp_path / 'part-3.parquet').column('username').to_pylist() == ['bob']
+
+
+def test_manifest_round_trip(tmp_path):
+    output = tmp_path / "urls.parquet"
+    archive = tmp_path / "alice_archive.json"
+    archive.write_text('{}')
+    assert load_manifest(output) is None
+
+    save_manifest(output, [archive], {'bob_archive.json': 1.0})
+    assert load_manifest(output) == {
+        'bob_archive.json': 1.0,
+        'alice_archive.json': archive.stat().st_mtime,
+    }
+
+
+def test_main_reanalyzes_updated_archives(run_main):
+    archive_dir, output_dir, main = run_main
+    write_archive(archive_dir / 'alice_archive.json', ['https://example.com/a'])
+    write_archive(archive_dir / 'bob_archive.json', ['https://example.com/b'])
+    main()
+
+    write_archive(archive_dir / 'bob_archive.json', ['https://example.com/b2', 'https://example.com/b3'])
+    bump_mtime(archive_dir / 'bob_archive.json')
+    main()
+
+    df = pd.read_parquet(output_dir)
+    assert sorted(df[df['username'] == 'bob']['url']) == ['https://example.com/b2', 'https://example.com/b3']
+    assert df[df['username'] == 'alice']['url'].tolist() == ['https://example.com/a']
+    assert all(p.name.startswith('part-') and p.suffix == '.parquet' for p in output_dir.iterdir())
+
+
+def test_main_keeps_rows_of_failed_archives(run_main):
+    archive_dir, output_dir, main = run_main
+    write_archive(archive_dir / 'alice_archive.json', ['https://example.com/a'])
+    write_archive(archive_dir / 'bob_archive.json', ['https://example.com/b'])
+    main()
+    analyzed_mtime = load_manifest(output_dir)['bob_archive.json']
+
+    (archive_dir / 'bob_archive.json').write_text('{"tweets": [')
+    bump_mtime(archive_dir / 'bob_archive.json')
+    main()
+
+    # bob's earlier rows survive and the next run retries the archive
+    df = pd.read_parquet(output_dir)
+    assert df[df['username'] == 'bob']['url'].tolist() == ['https://example.com/b']
+    assert load_manifest(output_dir)['bob_archive.json'] == analyzed_mtime
@@ -2,12 +2,15 @@ import pytest
 from pathlib import Path
 import json
 import pandas as pd
+import pyarrow as pa
 from datetime import datetime, timezone
 from unittest.mock import Mock, patch
 import asyncio
 
+from gaiwan.config import config
 from gaiwan.twitter_archive_processor.url_analysis.analyzer import URLAnalyzer
 from gaiwan.twitter_archive_processor.url_analysis.content import PageContent
+from gaiwan.twitter_archive_processor.url_analysis.domain import DomainNormalizer
 from .test_utils import create_mock_response, async_mock_coro
 
 @pytest.fixture
@@ -149,6 +152,54 @@ async def test_archive_sequential_processing(analyzer, temp_archive_dir, sample_
         assert len(processing_order) == 3
         assert processing_order == sorted(processing_order)  # Archives processed in order
 
+def test_build_url_frame_string_columns(analyzer):
+    content = PageContent(url="https://example.com/a", title="A", content_type="text/html")
+    contexts = [
+        {'username': 'user1', 'tweet_id': '1', 'tweet_created_at': None},
+        {'username': 'user2', 'tweet_id': '2', 'tweet_created_at': None},
+    ]
+    df = analyzer._build_url_frame({content.url: content}, {content.url: contexts})
+    
+    assert len(df) == 2
+    assert list(df['username']) == ['user1', 'user2']
+    assert list(df['title']) == ['A', 'A']
+    # Text columns come out Arrow-backed rather than object dtype
+    for column in ('url', 'domain', 'title', 'content_type', 'error'):
+        assert df[column].dtype == pd.ArrowDtype(pa.string())
+
+class PrefixingNormalizer(DomainNormalizer):
+    def normalize(self, domain: str) -> str:
+        return 'custom.' + super().normalize(domain)
+
+def test_analyze_archives_in_processes_matches_serial(temp_archive_dir, sample_tweet_data, monkeypatch):
+    for i in range(3):
+        create_archive_file(temp_archive_dir, f"user{i}", [sample_tweet_data])
+    analyzer = URLAnalyzer(archive_dir=temp_archive_dir)
+    analyzer.domain_normalizer = PrefixingNormalizer()
+    
+    monkeypatch.setattr(config, 'max_concurrent_processes', 1)
+    serial = analyzer.analyze_archives()
+    monkeypatch.setattr(config, 'max_concurrent_processes', 2)
+    parallel = analyzer.analyze_archives()
+    
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert serial['domain'].str.startswith('custom.').all()
+
+def test_analyze_archives_in_processes_skips_failed_archive(temp_archive_dir, sample_tweet_data,
+                                                           monkeypatch):
+    for i in range(2):
+        create_archive_file(temp_archive_dir, f"user{i}", [sample_tweet_data])
+    (temp_archive_dir / "broken_archive.json").write_text("invalid json")
+    analyzer = URLAnalyzer(archive_dir=temp_archive_dir)
+    
+    monkeypatch.setattr(config, 'max_concurrent_processes', 1)
+    serial = analyzer.analyze_archives()
+    monkeypatch.setattr(config, 'max_concurrent_processes', 3)
+    parallel = analyzer.analyze_archives()
+    
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert set(parallel['username']) == {'user0', 'user1'}
+
 def test_url_resolution(analyzer):
     with patch('requests.Session.head') as mock_head:
         mock_response = Mock()
@@ -163,6 +214,20 @@ def test_url_resolution(analyzer):
         assert resolved_again == "https://example.com/page"
         mock_head.assert_called_once()  # Should use cached result
 
+@pytest.mark.asyncio
+async def test_url_resolution_persists_across_instances(temp_archive_dir):
+    with patch('requests.Session.head') as mock_head:
+        mock_head.return_value = Mock(url="https://example.com/page")
+        
+        first = URLAnalyzer(archive_dir=temp_archive_dir)
+        assert first.resolve_url("https://t.co/abc123") == "https://example.com/page"
+        await first.aclose()
+        
+        second = URLAnalyzer(archive_dir=temp_archive_dir)
+        assert second.resolve_url("https://t.co/abc123") == "https://example.com/page"
+        await second.aclose()
+        mock_head.assert_called_once()
+
 def test_error_handling(analyzer, temp_archive_dir):
     # Test invalid archive file
     invalid_path = temp_archive_dir / "invalid_archive.json"
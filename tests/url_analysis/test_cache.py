@@ -0,0 +1,47 @@
+import time
+import pytest
+from gaiwan.twitter_archive_processor.url_analysis.cache import ContentCache
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ContentCache(tmp_path / "content.sqlite3")
+    yield cache
+    cache.close()
+
+def test_set_and_get(cache):
+    cache.set(b"key", b"value", time.time() + 60)
+    assert cache.get(b"key") == b"value"
+    assert cache.get(b"other") is None
+
+def test_overwrite(cache):
+    cache.set(b"key", b"old", time.time() + 60)
+    cache.set(b"key", b"new", time.time() + 60)
+    assert cache.get(b"key") == b"new"
+
+def test_expired_entries_are_misses(cache):
+    cache.set(b"key", b"value", time.time() - 1)
+    assert cache.get(b"key") is None
+
+def test_get_many(cache):
+    cache.set(b"a", b"1", time.time() + 60)
+    cache.set(b"b", b"2", time.time() - 1)
+    assert cache.get_many([b"a", b"b", b"c"]) == {b"a": b"1"}
+
+def test_writes_are_committed_in_groups(tmp_path):
+    path = tmp_path / "content.sqlite3"
+    cache = ContentCache(path, commit_every=2)
+    cache.set(b"a", b"1", time.time() + 60)
+    
+    # Pending rows are visible to the writer but not to other connections yet
+    assert cache.get(b"a") == b"1"
+    other = ContentCache(path)
+    assert other.get(b"a") is None
+    
+    cache.set(b"b", b"2", time.time() + 60)
+    assert other.get(b"b") == b"2"
+    
+    cache.set(b"c", b"3", time.time() + 60)
+    cache.flush()
+    assert other.get(b"c") == b"3"
+    other.close()
+    cache.close()
@@ -35,10 +35,11 @@ def mock_analyzer():
     analyzer = Mock()
     analyzer.domain_normalizer.shortener_domains = {'t.co', 'bit.ly'}
     analyzer.archive_dir = Mock()
-    analyzer.archive_dir.glob.return_value = [
+    analyzer.archives = [
         Path("user1_archive.json"),
         Path("user2_archive.json")
     ]
+    analyzer.archive_dir.glob.return_value = analyzer.archives
     return analyzer
 
 def test_reporter_overall_stats(sample_df, mock_analyzer, capsys):
@@ -150,6 +151,18 @@ def test_save_results(tmp_path):
     backup_files = list(tmp_path.glob("urls_*.parquet"))
     assert len(backup_files) == 1
 
+def test_save_results_skips_identical_backup(tmp_path):
+    output_file = tmp_path / "urls.parquet"
+    df = pd.DataFrame({'url': ['https://example.com'], 'domain': ['example.com']})
+    
+    save_results(df, output_file)
+    save_results(df, output_file)
+    
+    # Unchanged results should not produce a backup or leave a temp file
+    assert output_file.exists()
+    assert not list(tmp_path.glob("urls_*.parquet"))
+    assert not list(tmp_path.glob("*.tmp"))
+
 @pytest.mark.asyncio
 async def test_archive_progress_reporting(tmp_path, mock_analyzer):
     """Test two-level progress reporting (archives and URLs)."""
@@ -12,7 +12,7 @@ import ssl
 from aiohttp import web
 
 from gaiwan.twitter_archive_processor.url_analysis.content import ContentAnalyzer, PageContent
-from .test_utils import create_mock_response
+from .test_utils import create_mock_response, MockStreamReader
 from gaiwan.twitter_archive_processor.url_analysis.apis.youtube import YouTubeAPI
 from gaiwan.twitter_archive_processor.url_analysis.apis.twitter import TwitterAPI
 from gaiwan.twitter_archive_processor.url_analysis.apis.github import GitHubAPI
@@ -75,7 +75,9 @@ class AsyncMockResponse:
         self.html = html
         self.status = 200
         self.headers = {'content-type': 'text/html'}
+        self.charset = None
         self._text = html
+        self.content = MockStreamReader(html)
         
     async def __aenter__(self):
         return self
@@ -95,6 +97,16 @@ def test_page_content_initialization():
     assert isinstance(content.fetch_time, datetime)
     assert content.fetch_time.tzinfo == timezone.utc
 
+def test_page_content_keeps_explicit_fetch_time():
+    fetched = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    content = PageContent(url="https://example.com", fetch_time=fetched)
+    assert content.fetch_time == fetched
+    
+    # Instances do not share their default sets
+    other = PageContent(url="https://example.org")
+    other.links.add("https://link.com")
+    assert content.links == set()
+
 def test_page_content_to_dict():
     content = PageContent(
         url="https://example.com",
@@ -114,13 +126,22 @@ def test_page_content_to_dict():
     assert isinstance(data['fetch_time'], str)
 
 @pytest.mark.asyncio
-async def test_content_parsing(content_analyzer, sample_html):
+@pytest.mark.parametrize("use_selectolax", [True, False])
+async def test_content_parsing(content_analyzer, sample_html, use_selectolax):
+    if use_selectolax:
+        pytest.importorskip("selectolax")
+    content_analyzer.use_selectolax = use_selectolax
     url = "https://example.com"
     content_type = "text/html"
     
-    page_content = await content_analyzer._parse_content(url, sample_html, content_type)
+    page_content = await content_analyzer._parse_content(
+        PageContent(url=url, content_type=content_type, status_code=200), sample_html
+    )
     
     assert page_content.title == "Test Page"
+    # Plain str, not a bs4 NavigableString tied to the parse tree
+    assert type(page_content.title) is str
+    assert page_content.status_code == 200
     assert page_content.description == "Test description"
     assert "https://example.com" in page_content.links
     assert "https://example.com/image.jpg" in page_content.images
@@ -130,6 +151,31 @@ async def test_content_parsing(content_analyzer, sample_html):
     assert "JavaScript code" not in page_content.text_content
     assert "CSS styles" not in page_content.text_content
 
+@pytest.mark.asyncio
+async def test_content_parsing_in_process_pool(content_analyzer, sample_html):
+    content_analyzer.parse_processes = 1
+    
+    page_content = await content_analyzer._parse_content(PageContent(url="https://example.com"), sample_html)
+    
+    assert page_content.title == "Test Page"
+    assert page_content.description == "Test description"
+    assert "https://example.com/image.jpg" in page_content.images
+    
+    await content_analyzer.aclose()
+    assert content_analyzer._parse_pool is None
+
+@pytest.mark.parametrize("use_selectolax", [True, False])
+def test_main_content_whitespace_is_collapsed(content_analyzer, use_selectolax):
+    if use_selectolax:
+        pytest.importorskip("selectolax")
+        from selectolax.lexbor import LexborHTMLParser as parse
+    else:
+        parse = lambda html: BeautifulSoup(html, 'html.parser')
+    html = "<body><p>  first\n\n\tline </p>\n   <div>second\u00a0 line</div></body>"
+    
+    text = content_analyzer._extract_main_content(parse(html))
+    assert text == "first line second line"
+
 @pytest.mark.asyncio
 async def test_cache_operations(content_analyzer):
     content = PageContent(
@@ -138,22 +184,25 @@ async def test_cache_operations(content_analyzer):
         description="Test description"
     )
     
-    cache_path = content_analyzer._get_cache_path(content.url)
+    cache_key = content_analyzer._cache_key(content.url)
     
     # Test saving to cache
-    await content_analyzer._save_to_cache(cache_path, content)
-    assert cache_path.exists()
+    await content_analyzer._save_to_cache(cache_key, content)
+    assert content_analyzer.cache.get(cache_key) is not None
+    
+    # Everything lives in a single store file under the cache root
+    assert content_analyzer.cache.db_path.parent == content_analyzer.cache_dir
     
     # Test loading from cache
-    loaded_content = await content_analyzer._load_from_cache(cache_path)
+    loaded_content = await content_analyzer._load_from_cache(cache_key)
     assert loaded_content is not None
     assert loaded_content.url == content.url
     assert loaded_content.title == content.title
     
     # Test cache expiration
     loaded_content.fetch_time = datetime.now(timezone.utc) - timedelta(days=31)
-    await content_analyzer._save_to_cache(cache_path, loaded_content)
-    expired_content = await content_analyzer._load_from_cache(cache_path)
+    await content_analyzer._save_to_cache(cache_key, loaded_content)
+    expired_content = await content_analyzer._load_from_cache(cache_key)
     assert expired_content is None
 
 @pytest.mark.asyncio
@@ -164,7 +213,9 @@ async def test_analyze_url(content_analyzer, sample_html):
         def __init__(self):
             self.status = 200
             self.headers = {"content-type": "text/html"}
+            self.charset = None
             self._text = sample_html
+            self.content = MockStreamReader(sample_html)
         
         async def text(self):
             return self._text
@@ -195,7 +246,9 @@ async def test_analyze_urls(content_analyzer, sample_html):
         def __init__(self):
             self.status = 200
             self.headers = {"content-type": "text/html"}
+            self.charset = None
             self._text = sample_html
+            self.content = MockStreamReader(sample_html)
         
         async def text(self):
             return self._text
@@ -224,6 +277,12 @@ def test_url_validation(content_analyzer):
     assert not content_analyzer._is_valid_url("invalid-url")
     assert not content_analyzer._is_valid_url("/relative/path")
     assert not content_analyzer._is_valid_url("javascript:void(0)")
+    assert not content_analyzer._is_valid_url("")
+    assert not content_analyzer._is_valid_url("mailto:someone@example.com")
+    assert content_analyzer._is_valid_url("ftp://example.com/file.txt")
+    # A scheme with no host is not absolute
+    assert not content_analyzer._is_valid_url("https://")
+    assert not content_analyzer._is_valid_url("http:///path")
 
 @pytest.mark.asyncio
 async def test_concurrent_limits(content_analyzer):
@@ -234,7 +293,9 @@ async def test_concurrent_limits(content_analyzer):
         def __init__(self):
             self.status = 200
             self.headers = {"content-type": "text/html"}
+            self.charset = None
             self._text = "<html><title>Test</title></html>"
+            self.content = MockStreamReader(self._text, delay=0.1)
         
         async def text(self):
             await asyncio.sleep(0.1)
@@ -313,11 +374,11 @@ async def test_cache_expiration(content_analyzer, tmp_path):
     
     # Create and cache initial content
     content = PageContent(url=url, title="Test")
-    cache_path = content_analyzer._get_cache_path(url)
-    await content_analyzer._save_to_cache(cache_path, content)
+    cache_key = content_analyzer._cache_key(url)
+    await content_analyzer._save_to_cache(cache_key, content)
     
     # Immediate load should work
-    cached = await content_analyzer._load_from_cache(cache_path)
+    cached = await content_analyzer._load_from_cache(cache_key)
     assert cached is not None
     assert cached.title == "Test"
     
@@ -325,9 +386,207 @@ async def test_cache_expiration(content_analyzer, tmp_path):
     await asyncio.sleep(1.1)
     
     # Should return None after expiration
-    expired = await content_analyzer._load_from_cache(cache_path)
+    expired = await content_analyzer._load_from_cache(cache_key)
     assert expired is None
 
+@pytest.mark.asyncio
+async def test_cache_persists_across_instances(content_analyzer):
+    """Entries written by one analyzer are visible to the next one."""
+    url = "https://example.com"
+    original = PageContent(url=url, title="Test", status_code=200)
+    await content_analyzer._save_to_cache(content_analyzer._cache_key(url), original)
+    content_analyzer.cache.flush()
+    
+    reopened = ContentAnalyzer(cache_dir=content_analyzer.cache_dir)
+    cached = await reopened._load_from_cache(reopened._cache_key(url))
+    assert cached is not None
+    assert cached.title == "Test"
+    assert cached.status_code == 200
+    assert cached.fetch_time == original.fetch_time
+    
+    # Unknown keys are a plain miss
+    assert await reopened._load_from_cache(reopened._cache_key("https://missing.example")) is None
+
+@pytest.mark.asyncio
+async def test_analyze_urls_serves_cache_hits_without_fetching(content_analyzer):
+    """Cached URLs are resolved before any request is scheduled."""
+    url = "https://example.com"
+    await content_analyzer._save_to_cache(content_analyzer._cache_key(url), PageContent(url=url, title="Cached"))
+    
+    session = Mock()
+    progress = []
+    results = await content_analyzer.analyze_urls([url], session=session, progress_callback=progress.append)
+    
+    assert results[url].title == "Cached"
+    session.get.assert_not_called()
+    assert progress == [1]
+    assert url in content_analyzer.processed_urls
+
+@pytest.mark.asyncio
+async def test_pending_fetches_are_bounded(content_analyzer):
+    """No more than twice the concurrency limit is scheduled at once."""
+    content_analyzer.max_concurrent = 2
+    in_flight = peak = 0
+    
+    async def fake_analyze(session, url, limiter):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return PageContent(url=url)
+    
+    content_analyzer._analyze_with_limit = fake_analyze
+    urls = [f"https://example{i}.com" for i in range(20)]
+    results = await content_analyzer.analyze_urls(urls, session=Mock())
+    
+    assert set(results) == set(urls)
+    assert peak <= 4
+
+@pytest.mark.asyncio
+async def test_archive_stats_track_each_url(content_analyzer):
+    """Archive stats count processed URLs and errors as fetches finish."""
+    async def fake_analyze(session, url, limiter):
+        await asyncio.sleep(0.001)
+        return PageContent(url=url, error="boom" if url.endswith("3.com") else None)
+    
+    content_analyzer._analyze_with_limit = fake_analyze
+    urls = [f"https://example{i}.com" for i in range(5)]
+    results = await content_analyzer.analyze_archive_urls("archive", urls, session=Mock())
+    
+    assert set(results) == set(urls)
+    stats = content_analyzer.archive_stats["archive"]
+    assert stats["processed"] == 5
+    assert stats["errors"] == 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content_type", ["application/PDF", "image/png; charset=binary", "Video/mp4"])
+async def test_binary_content_is_skipped(content_analyzer, content_type):
+    session = Mock()
+    session.get.return_value = create_mock_response(b"binary", content_type=content_type)
+    
+    content = await content_analyzer.analyze_url(session, "https://example.com/file")
+    assert content.error == "Skipped binary content"
+    assert content.content_type == content_type
+
+@pytest.mark.asyncio
+async def test_read_html_caps_body_size(content_analyzer):
+    from gaiwan.twitter_archive_processor.url_analysis import content as content_module
+    response = create_mock_response("<html><title>Big</title>" + "x" * (content_module.MAX_HTML_BYTES * 2))
+    
+    text = await content_analyzer._read_html(response)
+    assert len(text) == content_module.MAX_HTML_BYTES
+    assert text.startswith("<html><title>Big</title>")
+
+@pytest.mark.asyncio
+async def test_read_html_uses_response_charset(content_analyzer):
+    response = create_mock_response("<title>Café</title>".encode("latin-1"))
+    response.charset = "latin-1"
+    assert await content_analyzer._read_html(response) == "<title>Café</title>"
+    
+    # Unknown charsets fall back to utf-8
+    response = create_mock_response("<title>Café</title>")
+    response.charset = "not-a-charset"
+    assert await content_analyzer._read_html(response) == "<title>Café</title>"
+
+@pytest.mark.asyncio
+async def test_oversized_content_length_is_skipped(content_analyzer):
+    response = create_mock_response("<html></html>")
+    response.headers["content-length"] = str(10 * 1024 * 1024)
+    session = Mock()
+    session.get.return_value = response
+    
+    content = await content_analyzer.analyze_url(session, "https://example.com/huge")
+    assert content.error == "Content too large"
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_revalidated(content_analyzer):
+    """Expired entries are refetched conditionally and renewed on 304."""
+    url = "https://example.com"
+    cache_key = content_analyzer._cache_key(url)
+    stale = PageContent(
+        url=url, title="Cached", status_code=200, etag='"abc"',
+        last_modified="Mon, 01 Jan 2024 00:00:00 GMT",
+        fetch_time=datetime.now(timezone.utc) - timedelta(days=31)
+    )
+    await content_analyzer._save_to_cache(cache_key, stale)
+    
+    session = Mock()
+    session.get.return_value = create_mock_response("", status=304)
+    content = await content_analyzer.analyze_url(session, url)
+    
+    _, kwargs = session.get.call_args
+    assert kwargs['headers'] == {
+        'If-None-Match': '"abc"',
+        'If-Modified-Since': "Mon, 01 Jan 2024 00:00:00 GMT"
+    }
+    assert content.title == "Cached"
+    assert await content_analyzer._load_from_cache(cache_key) is not None
+
+@pytest.mark.asyncio
+async def test_successful_fetch_records_validators(content_analyzer, sample_html):
+    url = "https://example.com"
+    response = create_mock_response(sample_html)
+    response.headers.update({'ETag': '"v1"', 'Last-Modified': "Mon, 01 Jan 2024 00:00:00 GMT"})
+    session = Mock()
+    session.get.return_value = response
+    
+    content = await content_analyzer.analyze_url(session, url)
+    assert session.get.call_args[1]['headers'] is None
+    assert content.etag == '"v1"'
+    
+    cached = await content_analyzer._load_from_cache(content_analyzer._cache_key(url))
+    assert cached.title == "Test Page"
+    assert cached.last_modified == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+@pytest.mark.asyncio
+async def test_one_failing_url_does_not_abort_the_run(content_analyzer):
+    urls = ["https://good.com", "https://bad.com"]
+    
+    async def fake_analyze_url(session, url):
+        if url == "https://bad.com":
+            raise RuntimeError("boom")
+        return PageContent(url=url, title="Good")
+    
+    content_analyzer.analyze_url = fake_analyze_url
+    results = await content_analyzer.analyze_urls(urls, session=Mock())
+    
+    assert results["https://good.com"].title == "Good"
+    assert results["https://bad.com"].error == "boom"
+
+@pytest.mark.asyncio
+async def test_shared_session_is_reused_until_closed(content_analyzer):
+    session = await content_analyzer._get_session()
+    assert await content_analyzer._get_session() is session
+    
+    await content_analyzer.aclose()
+    assert session.closed
+    
+    replacement = await content_analyzer._get_session()
+    assert replacement is not session
+    await content_analyzer.aclose()
+
+@pytest.mark.asyncio
+async def test_duplicate_urls_fetched_once(content_analyzer):
+    """Repeated URLs share one fetch and still count towards progress."""
+    class MockSession:
+        call_count = 0
+        
+        @asynccontextmanager
+        async def get(self, *args, **kwargs):
+            self.call_count += 1
+            yield create_mock_response("<html><title>Test</title></html>")
+    
+    session = MockSession()
+    progress = []
+    urls = ["https://a.com", "https://b.com", "https://a.com", "https://a.com"]
+    
+    results = await content_analyzer.analyze_urls(urls, session=session, progress_callback=progress.append)
+    
+    assert session.call_count == 2
+    assert set(results) == {"https://a.com", "https://b.com"}
+    assert sum(progress) == len(urls)
+
 # Add new test cases for URL processing log
 @pytest.mark.asyncio
 async def test_url_processing_log(content_analyzer, tmp_path):
@@ -359,11 +618,77 @@ async def test_url_processing_log(content_analyzer, tmp_path):
     assert failed_url not in content_analyzer.processed_urls  # Failed URLs aren't cached
     
     # Test log persistence
+    # Buffered lines reach the file on flush
+    await content_analyzer.flush_log()
     # Create new analyzer instance to test log loading
     new_analyzer = ContentAnalyzer(cache_dir=tmp_path)
     assert url in new_analyzer.processed_urls
     assert failed_url not in new_analyzer.processed_urls
 
+def test_url_processing_log_skips_bad_rows(tmp_path):
+    """Malformed log rows are ignored instead of aborting the load."""
+    (tmp_path / 'processed_urls.csv').write_text(
+        "url,timestamp,status\n"
+        "https://a.com,2024-01-01T00:00:00+00:00,success\n"
+        "https://b.com,2024-01-01T00:00:00+00:00,failed\n"
+        "https://c.com/x,y,2024-01-01T00:00:00+00:00,success\n"
+        "https://d.com,not-a-timestamp,success\n"
+    )
+    
+    analyzer = ContentAnalyzer(cache_dir=tmp_path)
+    assert analyzer.processed_urls == {
+        "https://a.com": datetime(2024, 1, 1, tzinfo=timezone.utc)
+    }
+
+def test_url_processing_log_shares_timestamps(tmp_path):
+    """URLs logged at the same instant share one datetime object."""
+    (tmp_path / 'processed_urls.csv').write_text("url,timestamp,status\n" + "".join(
+        f"https://example{i}.com,2024-01-01T00:00:00+00:00,success\n" for i in range(3)
+    ))
+    
+    stamps = list(ContentAnalyzer(cache_dir=tmp_path).processed_urls.values())
+    assert len(stamps) == 3
+    assert stamps[0] is stamps[1] is stamps[2]
+
+@pytest.mark.asyncio
+async def test_url_processing_log_is_buffered(content_analyzer):
+    """Log lines are held in memory until the buffer fills or is flushed."""
+    content_analyzer.log_flush_size = 3
+    log_size = content_analyzer.url_log_path.stat().st_size
+    
+    await content_analyzer._log_processed_url("https://a.com", 'success')
+    await content_analyzer._log_processed_url("https://b.com", 'failed')
+    assert content_analyzer.url_log_path.stat().st_size == log_size
+    
+    await content_analyzer._log_processed_url("https://c.com", 'success')
+    lines = content_analyzer.url_log_path.read_text().splitlines()
+    assert [line.split(',')[0] for line in lines[1:]] == [
+        "https://a.com", "https://b.com", "https://c.com"
+    ]
+    
+    await content_analyzer._log_processed_url("https://d.com", 'success')
+    await content_analyzer.aclose()
+    assert content_analyzer.url_log_path.read_text().splitlines()[-1].startswith("https://d.com,")
+
+@pytest.mark.asyncio
+async def test_recent_url_cache_miss_looks_up_once(content_analyzer):
+    """A recently processed URL missing from the cache costs one lookup."""
+    url = "https://example.com"
+    await content_analyzer._log_processed_url(url, 'success')
+    
+    lookups = []
+    load = content_analyzer._load_from_cache
+    async def counting_load(key):
+        lookups.append(key)
+        return await load(key)
+    content_analyzer._load_from_cache = counting_load
+    
+    session = Mock()
+    session.get.return_value = create_mock_response("<html><title>Test</title></html>")
+    await content_analyzer.analyze_url(session, url)
+    
+    assert lookups == [content_analyzer._cache_key(url)]
+
 @pytest.mark.asyncio
 async def test_url_processing_cache_ttl(content_analyzer, tmp_path):
     """Test URL processing respects cache TTL."""
@@ -513,5 +838,4 @@ async def test_url_deduplication_across_archives(content_analyzer, tmp_path):
     assert request_count == 1
     
     # Verify URL was cached
-    cache_path = content_analyzer._get_cache_path(url)
-    assert cache_path.exists() 
\ No newline at end of file
+    assert content_analyzer.cache.get(content_analyzer._cache_key(url)) is not None
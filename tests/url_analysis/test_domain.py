@@ -24,4 +24,23 @@ def test_shortener_detection():
     
     assert normalizer.is_shortener('t.co') == True
     assert normalizer.is_shortener('bit.ly') == True
-    assert normalizer.is_shortener('youtube.com') == False
\ No newline at end of file
+    assert normalizer.is_shortener('youtube.com') == False
+
+
+def test_domain_normalization_suffixes():
+    normalizer = DomainNormalizer()
+    
+    assert normalizer.normalize('someone.medium.com') == 'medium.com'
+    assert normalizer.normalize('Newsletter.Substack.com') == 'substack.com'
+    assert normalizer.normalize('www.gist.github.com') == 'github.com'
+    # Lookalike domains must not match a suffix group
+    assert normalizer.normalize('notx.com') == 'notx.com'
+    assert normalizer.normalize('example.org') == 'example.org'
+
+def test_domain_normalization_is_memoized():
+    normalizer = DomainNormalizer()
+    
+    for _ in range(3):
+        assert normalizer.normalize('www.youtube.com') == 'youtube.com'
+    
+    assert normalizer._normalized == {'www.youtube.com': 'youtube.com'}
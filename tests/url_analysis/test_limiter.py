@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from gaiwan.twitter_archive_processor.url_analysis.limiter import AdaptiveLimiter
+
+@pytest.mark.asyncio
+async def test_limits_concurrency():
+    limiter = AdaptiveLimiter(2)
+    active = peak = 0
+    
+    async def task():
+        nonlocal active, peak
+        async with limiter:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+    
+    await asyncio.gather(*(task() for _ in range(6)))
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_throttle_and_recover():
+    limiter = AdaptiveLimiter(3, grow_after=2)
+    
+    await limiter.throttle()
+    await limiter.throttle()
+    await limiter.throttle()
+    assert limiter.limit == 1  # Never below the minimum
+    
+    for _ in range(4):
+        await limiter.record_success()
+    assert limiter.limit == 3
+    
+    for _ in range(2):
+        await limiter.record_success()
+    assert limiter.limit == 3  # Never above the configured maximum
+
+@pytest.mark.asyncio
+async def test_per_host_limit():
+    limiter = AdaptiveLimiter(4, per_host=1)
+    active = {"a.com": 0, "b.com": 0}
+    peak = {"a.com": 0, "b.com": 0}
+    
+    async def task(host):
+        async with limiter.host(host):
+            async with limiter:
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+                await asyncio.sleep(0.01)
+                active[host] -= 1
+    
+    await asyncio.gather(*(task(host) for host in ["a.com", "b.com"] * 3))
+    assert peak == {"a.com": 1, "b.com": 1}
+
+@pytest.mark.asyncio
+async def test_back_off_only_delays_that_host():
+    limiter = AdaptiveLimiter(2)
+    limiter.back_off("slow.com", 0.2)
+    
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await limiter.wait_for_host("fast.com")
+    assert loop.time() - start < 0.1
+    
+    await limiter.wait_for_host("slow.com")
+    assert loop.time() - start >= 0.15
@@ -82,4 +82,15 @@ def test_metadata_status_transitions():
     last_time = metadata.last_fetch_time
     time.sleep(0.001)  # Add a small delay
     metadata.mark_success("text/html")
-    assert metadata.last_fetch_time > last_time 
\ No newline at end of file
+    assert metadata.last_fetch_time > last_time 
+
+
+def test_to_dict_reformats_changed_fetch_time():
+    metadata = URLMetadata(url="https://example.com")
+    metadata.mark_success("text/html")
+    first = metadata.to_dict()['last_fetch_time']
+    assert first == metadata.last_fetch_time.isoformat()
+    assert metadata.to_dict()['last_fetch_time'] is first
+    
+    metadata.last_fetch_time = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    assert metadata.to_dict()['last_fetch_time'] == "2020-01-01T00:00:00+00:00"
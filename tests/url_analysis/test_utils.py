@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import Mock
 from contextlib import asynccontextmanager
 
@@ -12,15 +13,29 @@ class AsyncContextManagerMock:
     async def __aexit__(self, *args):
         pass
 
+class MockStreamReader:
+    """Mock for aiohttp's StreamReader (response.content)."""
+    def __init__(self, body, delay=0):
+        self.body = body.encode() if isinstance(body, str) else body
+        self.delay = delay
+
+    async def iter_chunked(self, n):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        for i in range(0, len(self.body), n):
+            yield self.body[i:i + n]
+
 class AsyncMockResponse:
     """Mock specifically for aiohttp response."""
     def __init__(self, content, status=200, content_type="text/html"):
-        self.content = content
+        self._text = content
+        self.content = MockStreamReader(content)
+        self.charset = None
         self.status = status
         self.headers = {"content-type": content_type}
 
     async def text(self):
-        return self.content
+        return self._text
 
     async def __aenter__(self):
         return self